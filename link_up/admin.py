@@ -2,7 +2,7 @@ from .models import Event
 from .models import Student
 from .models import Venue
 from django.contrib import admin
-from .models import Computer, StudyRoom, Manager
+from .models import Computer, StudyRoom, Manager, ReservationArchive, WaitlistEntry
 
 @admin.register(Computer)
 class ComputerAdmin(admin.ModelAdmin):
@@ -21,5 +21,29 @@ class StudyRoomAdmin(admin.ModelAdmin):
 
 admin.site.register(Venue)
 admin.site.register(Student)
-admin.site.register(Event)
+@admin.register(Event)
+class EventAdmin(admin.ModelAdmin):
+    list_display = ("name", "event_date", "venue", "capacity", "attendee_count")
+    readonly_fields = ("attendee_count",)
+    search_fields = ("name",)
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ("event", "student", "created_at")
+    list_filter = ("event",)
+
+
+@admin.register(ReservationArchive)
+class ReservationArchiveAdmin(admin.ModelAdmin):
+    # History is append-only; rows only arrive through the expiry job
+    list_display = ("reservation_id", "resource_type", "resource_id", "user", "start", "end")
+    list_filter = ("resource_type",)
+    date_hierarchy = "start"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 admin.site.register(Manager)
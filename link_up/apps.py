@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class LinkUpConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'link_up'
+
+    def ready(self):
+        import link_up.signals  # Cache invalidation hooks
+        from django.db.backends.signals import connection_created
+        from .db import apply_sqlite_profile
+        connection_created.connect(apply_sqlite_profile, dispatch_uid="link_up.sqlite_profile")
@@ -0,0 +1,141 @@
+"""
+Half-hour availability engine shared by the map, the slot picker and booking.
+
+Each resource gets a 48-cell bitmap for one local day (cell 0 is 00:00-00:30).
+A reservation sets every cell it touches, so "is this window free" is a
+single AND against a mask and listing the day's windows is one pass.
+"""
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+SLOT_MINUTES = 30
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+
+# Window offered by the slot picker (8am-8pm, 1-hour bookings every half hour)
+OPEN_TIME = time(8, 0)
+CLOSE_TIME = time(20, 0)
+BOOKING_LENGTH = timedelta(hours=1)
+
+
+def day_bounds(day, tz=None):
+    """Aware datetimes for the start and end of a local day."""
+    tz = tz or timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(day, time(0, 0)), tz)
+    return start, start + timedelta(days=1)
+
+
+class DayAvailability:
+    """Occupancy bitmap for a single resource on a single local day."""
+
+    def __init__(self, day, tz=None):
+        self.day = day
+        self.tz = tz or timezone.get_current_timezone()
+        self.mask = 0
+        # user id holding each cell, so "who has it now" needs no extra lookup
+        self.holders = [None] * SLOTS_PER_DAY
+
+    def _cell(self, dt, round_up=False):
+        local = timezone.localtime(dt, self.tz)
+        if local.date() < self.day:
+            return 0
+        if local.date() > self.day:
+            return SLOTS_PER_DAY
+        seconds = local.hour * 3600 + local.minute * 60 + local.second
+        idx, rem = divmod(seconds, SLOT_MINUTES * 60)
+        if round_up and (rem or local.microsecond):
+            idx += 1
+        return min(idx, SLOTS_PER_DAY)
+
+    def _cells(self, start, end):
+        first = self._cell(start)
+        last = self._cell(end, round_up=True)
+        return first, max(first, last)
+
+    def _range_mask(self, start, end):
+        first, last = self._cells(start, end)
+        return ((1 << (last - first)) - 1) << first
+
+    def add(self, start, end, user_id=None):
+        first, last = self._cells(start, end)
+        self.mask |= ((1 << (last - first)) - 1) << first
+        for idx in range(first, last):
+            self.holders[idx] = user_id
+
+    def add_reservation(self, res):
+        self.add(res.start, res.end, res.user_id)
+
+    def is_free(self, start, end):
+        return not (self.mask & self._range_mask(start, end))
+
+    def is_free_at(self, dt):
+        idx = self._cell(dt)
+        return idx >= SLOTS_PER_DAY or not (self.mask >> idx) & 1
+
+    def holder_at(self, dt):
+        idx = self._cell(dt)
+        if idx >= SLOTS_PER_DAY:
+            return None
+        return self.holders[idx]
+
+    def cell_range(self, start, end):
+        """First and last (exclusive) cell index covered by start..end."""
+        return self._cells(start, end)
+
+    def bitstring(self, first, last):
+        """One character per cell in [first, last): "1" free, "0" booked."""
+        return "".join("0" if (self.mask >> idx) & 1 else "1"
+                       for idx in range(first, last))
+
+    def windows(self, start_at, day_end, length=BOOKING_LENGTH):
+        """Candidate bookings from start_at, stepping by one slot, with their availability."""
+        slots = []
+        step = timedelta(minutes=SLOT_MINUTES)
+        cursor = start_at
+        while cursor + length <= day_end:
+            end_cursor = cursor + length
+            slots.append({
+                "start": cursor.isoformat(),
+                "end": end_cursor.isoformat(),
+                "available": self.is_free(cursor, end_cursor),
+            })
+            cursor += step
+        return slots
+
+
+class AvailabilityIndex:
+    """Per-resource DayAvailability bitmaps built from one reservation list."""
+
+    def __init__(self, day, reservations=(), tz=None):
+        self.day = day
+        self.tz = tz or timezone.get_current_timezone()
+        self._by_resource = {}
+        for res in reservations:
+            self.for_resource(res.resource_type, res.resource_id).add_reservation(res)
+
+    def for_resource(self, resource_type, resource_id):
+        key = (resource_type, resource_id)
+        if key not in self._by_resource:
+            self._by_resource[key] = DayAvailability(self.day, self.tz)
+        return self._by_resource[key]
+
+    def get(self, resource_type, resource_id):
+        """The resource's bitmap, or an empty one if it has no bookings today."""
+        return self._by_resource.get((resource_type, resource_id)) or DayAvailability(self.day, self.tz)
+
+    def holder_at(self, resource_type, resource_id, dt):
+        avail = self._by_resource.get((resource_type, resource_id))
+        return avail.holder_at(dt) if avail else None
+
+
+def reservations_for_day(queryset, day, tz=None):
+    """Restrict a Reservation queryset to bookings touching the given local day."""
+    start, end = day_bounds(day, tz)
+    return queryset.filter(start__lt=end, end__gt=start)
+
+
+def picker_bounds(day, tz=None):
+    """Aware datetimes for the slot picker's opening and closing time."""
+    tz = tz or timezone.get_current_timezone()
+    return (timezone.make_aware(datetime.combine(day, OPEN_TIME), tz),
+            timezone.make_aware(datetime.combine(day, CLOSE_TIME), tz))
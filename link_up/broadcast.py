@@ -0,0 +1,54 @@
+"""
+In-process broadcaster for seat/room status changes.
+
+Each open status stream subscribes with its own asyncio queue. Writers (sync
+views and signal handlers, usually on another thread) publish small dicts
+that are handed to every subscriber's event loop thread-safely. No outside
+broker is involved, so only streams served by this process see the message;
+streams also resync from the floor snapshot on every heartbeat.
+"""
+import asyncio
+import threading
+
+# Per-subscriber backlog; a stream that falls this far behind just waits for
+# its next heartbeat resync instead of buffering without bound.
+QUEUE_SIZE = 256
+
+
+class Broadcaster:
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue):
+        with self._lock:
+            self._subscribers = {s for s in self._subscribers if s[1] is not queue}
+
+    def publish(self, message):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, message)
+            except RuntimeError:
+                # Loop already closed; the stream's finally block will unsubscribe
+                pass
+
+
+def _offer(queue, message):
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        pass
+
+
+status_changes = Broadcaster()
@@ -0,0 +1,33 @@
+"""
+Version counters kept in Django's cache framework.
+
+Anything cached from a set of models is keyed by the counter for that scope
+(e.g. "floor"), and signal handlers bump the counter on every write, so stale
+entries are simply never looked up again and age out on their own.
+"""
+import time
+
+from django.core.cache import cache
+
+KEY_PREFIX = "link_up:version:"
+
+
+def get_version(scope):
+    key = KEY_PREFIX + scope
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so an evicted counter never reuses an old number
+        version = int(time.time() * 1000)
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_version(scope):
+    key = KEY_PREFIX + scope
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Counter was missing or evicted; start a fresh one
+        get_version(scope)
+        return cache.incr(key)
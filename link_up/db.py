@@ -0,0 +1,56 @@
+"""
+SQLite connection tuning.
+
+settings.py takes its connection settings from here (SQLITE_TIMEOUT and
+connection_settings, which rejects an unknown LINK_UP_DB_PROFILE at
+startup). apply_sqlite_profile is hooked to connection_created (see
+LinkUpConfig.ready) and runs the profile's PRAGMAs on every new SQLite
+connection. "production" switches to WAL so readers no longer wait behind
+a writer, relaxes fsyncs to once per checkpoint (synchronous=NORMAL is
+still crash-safe in WAL mode), and gives each connection a bigger page
+cache and a memory-mapped read path.
+"""
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+# Seconds a connection waits for the write lock before "database is locked"
+# (OPTIONS["timeout"], which sets SQLite's busy timeout)
+SQLITE_TIMEOUT = 20
+
+SQLITE_PROFILES = {
+    # Leave whatever the database file and SQLite defaults say
+    "default": {},
+    # SQLite's own defaults spelled out, so a WAL file can be switched back
+    # (the benchmark's baseline)
+    "rollback": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+    },
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,           # negative = KiB, so ~64 MB
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+}
+
+def connection_settings(profile):
+    """DATABASES entries for profile; raises ImproperlyConfigured if it's unknown."""
+    if profile not in SQLITE_PROFILES:
+        raise ImproperlyConfigured(
+            f"Unknown LINK_UP_DB_PROFILE {profile!r}; pick one of {', '.join(SQLITE_PROFILES)}")
+    # No persistent connections for any profile: the status stream runs the
+    # app under ASGI, where each request may get a new thread and connections
+    # kept past the request are never reused or closed.
+    return {"CONN_MAX_AGE": 0}
+
+
+def apply_sqlite_profile(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    # Validated once when settings load (connection_settings)
+    pragmas = SQLITE_PROFILES[getattr(settings, "LINK_UP_DB_PROFILE", "default")]
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
@@ -0,0 +1,62 @@
+"""
+ETag functions for conditional GETs (django.views.decorators.http.condition).
+
+A page's tag is derived from the cache version counters of the models it
+shows (bumped on every write, deletes included) plus everything else that
+changes its HTML: the viewer, their CSRF cookie, and the clock-driven bits
+(live seat status, events turning into "Event Ended").
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.db.models import Min
+from django.utils import timezone
+
+from .cache_versions import get_version
+from .floor import get_snapshot
+from .models import Event
+from .routers import primary
+
+
+def _make_etag(request, *parts):
+    # Pending flash messages are shown (and consumed) by the render itself
+    if len(messages.get_messages(request)):
+        return None
+    user = request.user
+    parts = (
+        user.pk, user.is_staff,
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ""),
+        request.get_full_path(),
+    ) + parts
+    return hashlib.md5("|".join(str(p) for p in parts).encode()).hexdigest()
+
+
+def _next_event_start(now):
+    # When the next event starts its card flips to "Event Ended"; remember the
+    # moment per events version so the lookup runs once per change/boundary.
+    key = f"link_up:events:next-start:{get_version('events')}"
+    cached = cache.get(key)
+    if cached is not None and (cached == "none" or cached > now):
+        return cached
+    with primary():
+        next_start = Event.objects.filter(event_date__gt=now).aggregate(
+            next_start=Min("event_date"))["next_start"] or "none"
+    cache.set(key, next_start, None)
+    return next_start
+
+
+def floor_etag(request, *args, **kwargs):
+    snapshot = get_snapshot()
+    return _make_etag(request, get_version("floor"), snapshot["valid_until"])
+
+
+def events_etag(request, *args, **kwargs):
+    # The date picks the default calendar month
+    return _make_etag(request, get_version("events"), timezone.localdate(),
+                      _next_event_start(timezone.now()))
+
+
+def venues_etag(request, *args, **kwargs):
+    return _make_etag(request, get_version("events"))
@@ -0,0 +1,85 @@
+"""
+Month calendar with the month's events listed in their day cells.
+
+The grid is the same for every viewer, so the rendered HTML is cached per
+(year, month, "event_calendar" version); the version is bumped whenever an
+Event is saved or deleted (RSVPs don't touch it).
+"""
+from calendar import HTMLCalendar
+from datetime import date, datetime, time
+
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import format_html, format_html_join
+
+from .cache_versions import get_version
+from .models import Event
+from .routers import primary
+
+# Rendered months only change through the version key, keep them a day
+CALENDAR_TIMEOUT = 60 * 60 * 24
+
+
+def month_bounds(year, month):
+    """Aware [start, end) datetimes covering the local calendar month."""
+    tz = timezone.get_current_timezone()
+    first = date(year, month, 1)
+    following = date(year + month // 12, month % 12 + 1, 1)
+    return (timezone.make_aware(datetime.combine(first, time(0, 0)), tz),
+            timezone.make_aware(datetime.combine(following, time(0, 0)), tz))
+
+
+def events_by_day(year, month):
+    """{day of month: [(pk, name, local time)]} from one ranged query."""
+    start, end = month_bounds(year, month)
+    rows = Event.objects.filter(event_date__gte=start, event_date__lt=end).order_by(
+        "event_date", "pk").values_list("pk", "name", "event_date")
+    buckets = {}
+    for pk, name, when in rows:
+        when = timezone.localtime(when)
+        buckets.setdefault(when.day, []).append((pk, name, when))
+    return buckets
+
+
+class EventCalendar(HTMLCalendar):
+    """HTMLCalendar whose day cells list that day's events."""
+
+    cssclass_month = "month table table-bordered event-calendar"
+
+    def __init__(self, year, month, buckets):
+        super().__init__()
+        self.year = year
+        self.month = month
+        self.buckets = buckets
+        self.day_url = reverse("link_up:all-events-student")
+
+    def formatday(self, day, weekday):
+        if day == 0:
+            return super().formatday(day, weekday)
+        items = self.buckets.get(day, ())
+        iso = date(self.year, self.month, day).isoformat()
+        # Each day links to the listing filtered down to that single day
+        link = format_html('<a class="day-number" href="{}?from={}&amp;to={}">{}</a>',
+                           self.day_url, iso, iso, day)
+        events = format_html_join("", '<li title="{}">{} {}</li>', (
+            (name, when.strftime("%I:%M %p").lstrip("0"), name)
+            for _, name, when in items
+        ))
+        css = self.cssclasses[weekday] + (" has-events" if items else "")
+        if items:
+            return format_html('<td class="{}">{}<ul class="cal-events">{}</ul></td>',
+                               css, link, events)
+        return format_html('<td class="{}">{}</td>', css, link)
+
+
+def render_month(year, month):
+    """HTML for the event calendar of year/month, cached until an Event changes."""
+    key = f"link_up:calendar:{year}-{month:02d}:{get_version('event_calendar')}"
+    html = cache.get(key)
+    if html is None:
+        with primary():
+            buckets = events_by_day(year, month)
+        html = EventCalendar(year, month, buckets).formatmonth(year, month)
+        cache.set(key, html, CALENDAR_TIMEOUT)
+    return html
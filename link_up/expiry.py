@@ -0,0 +1,77 @@
+from django.db import transaction
+from django.db.models import Exists, Min, OuterRef
+from django.utils import timezone
+
+from .cache_versions import bump_version
+from .models import Computer, StudyRoom, Reservation, ReservationArchive
+
+# Rows moved per transaction, so the write lock is never held for long
+ARCHIVE_BATCH_SIZE = 500
+
+
+def _cleanup_status_for_resource(model_cls, resource_type, now):
+    # If a resource is marked reserved/occupied but has no live reservation, free it.
+    # Done as one UPDATE ... WHERE NOT EXISTS (...) so the cost doesn't grow with the lab.
+    active = Reservation.objects.filter(
+        **{resource_type: OuterRef("pk")},
+        start__lte=now,
+        end__gt=now
+    )
+    return model_cls.objects.filter(
+        status__in=["reserved", "occupied"],
+        reserved_by__isnull=False
+    ).filter(~Exists(active)).update(status="available", reserved_by=None)
+
+
+def archive_expired(now=None, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Move every reservation that has ended into ReservationArchive, oldest
+    first, batch_size rows per transaction. Returns the number moved.
+
+    Reservation signals don't fire; the caller invalidates "floor" once.
+    """
+    now = now or timezone.now()
+    moved = 0
+    while True:
+        with transaction.atomic():
+            batch = list(Reservation.objects.filter(end__lte=now).order_by("end", "id")[:batch_size])
+            if not batch:
+                return moved
+            ReservationArchive.objects.bulk_create([
+                ReservationArchive(
+                    reservation_id=res.pk, resource_type=res.resource_type,
+                    resource_id=res.resource_id, user_id=res.user_id,
+                    start=res.start, end=res.end,
+                )
+                for res in batch
+            ])
+            # Raw DELETE: nothing references Reservation, and the per-row
+            # post_delete receivers (cache bumps, status pushes, utilization)
+            # have nothing to do for bookings that already ended
+            doomed = Reservation.objects.filter(pk__in=[res.pk for res in batch])
+            doomed._raw_delete(doomed.db)
+        moved += len(batch)
+
+
+def expire_reservations(now=None, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Archive every reservation that has ended and release any computer or
+    study room still flagged as reserved/occupied without a live booking.
+    Returns the number of reservations archived.
+    """
+    now = now or timezone.now()
+    expired = archive_expired(now, batch_size)
+    released = _cleanup_status_for_resource(Computer, "computer", now)
+    released += _cleanup_status_for_resource(StudyRoom, "room", now)
+    if expired or released:
+        # The raw DELETE and bulk UPDATE skip the model signals, so
+        # invalidate the floor snapshot here, once per run
+        bump_version("floor")
+    return expired
+
+
+def next_expiry(now=None):
+    """Return the earliest end time of a reservation that is still running."""
+    now = now or timezone.now()
+    return Reservation.objects.filter(end__gt=now).aggregate(
+        next_end=Min("end"))["next_end"]
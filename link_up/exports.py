@@ -0,0 +1,114 @@
+"""
+Streaming CSV exports.
+
+Rows come from values_list().iterator(chunk_size=...) and go straight
+through csv.writer into a StreamingHttpResponse, so neither the queryset
+nor the file is ever held in memory whole, however long the history is.
+"""
+import csv
+import heapq
+from operator import itemgetter
+
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import (
+    Computer, Event, Reservation, ReservationArchive, StudyRoom, WaitlistEntry,
+)
+
+CHUNK_SIZE = 2000
+LINES_PER_CHUNK = 500
+
+
+class Echo:
+    """File-like object whose write() just hands the line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def csv_response(filename, header, rows):
+    writer = csv.writer(Echo())
+
+    def lines():
+        # A few hundred rows per chunk: small enough to stay flat on memory,
+        # big enough that the server isn't flushing one line at a time
+        batch = [writer.writerow(header)]
+        for row in rows:
+            batch.append(writer.writerow(row))
+            if len(batch) >= LINES_PER_CHUNK:
+                yield "".join(batch)
+                batch = []
+        if batch:
+            yield "".join(batch)
+
+    response = StreamingHttpResponse(lines(), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def _local(dt):
+    return timezone.localtime(dt).strftime("%Y-%m-%d %H:%M")
+
+
+ATTENDEE_HEADER = ("status", "username", "first_name", "last_name", "email",
+                   "student_id", "since")
+
+
+def attendee_rows(event):
+    """Seated students, then the waitlist in queue order."""
+    seated = Event.attendees.through.objects.filter(event=event).order_by(
+        "student__user__last_name", "student__user__first_name").values_list(
+        "student__user__username", "student__user__first_name", "student__user__last_name",
+        "student__user__email", "student__student_id")
+    for row in seated.iterator(chunk_size=CHUNK_SIZE):
+        yield ("attending", *row, "")
+
+    waiting = WaitlistEntry.objects.filter(event=event).order_by("created_at", "id").values_list(
+        "student__user__username", "student__user__first_name", "student__user__last_name",
+        "student__user__email", "student__student_id", "created_at")
+    for *row, created_at in waiting.iterator(chunk_size=CHUNK_SIZE):
+        yield ("waitlisted", *row, _local(created_at))
+
+
+RESERVATION_HEADER = ("id", "resource_type", "resource_id", "resource_name", "username",
+                      "start", "end", "minutes", "archived")
+
+
+def _reservation_values(queryset, id_field, start, end):
+    # queryset must provide resource_type and a resource_pk column
+    if start is not None:
+        queryset = queryset.filter(start__gte=start)
+    if end is not None:
+        queryset = queryset.filter(start__lt=end)
+    return queryset.order_by("start", id_field).values_list(
+        "start", id_field, "resource_type", "resource_pk", "user__username", "end"
+    ).iterator(chunk_size=CHUNK_SIZE)
+
+
+def reservation_rows(start=None, end=None):
+    """
+    Reservation history, oldest first, optionally limited to [start, end):
+    the archive and the live table, merged on start as both stream in.
+    """
+    # Seat and room names are small lookup tables, fetched once up front
+    names = {
+        "computer": dict(Computer.objects.values_list("id", "name")),
+        "room": dict(StudyRoom.objects.values_list("id", "name")),
+    }
+    archived = ((*row, "yes") for row in _reservation_values(
+        ReservationArchive.objects.annotate(resource_pk=F("resource_id")),
+        "reservation_id", start, end))
+    live = ((*row, "no") for row in _reservation_values(
+        Reservation.objects.annotate(resource_pk=Coalesce("computer_id", "room_id")),
+        "id", start, end))
+    for res_start, pk, resource_type, resource_id, username, res_end, is_archived in heapq.merge(
+            archived, live, key=itemgetter(0)):
+        yield (
+            pk, resource_type, resource_id,
+            names.get(resource_type, {}).get(resource_id, ""), username or "",
+            _local(res_start), _local(res_end),
+            int((res_end - res_start).total_seconds() // 60), is_archived,
+        )
@@ -0,0 +1,136 @@
+"""
+Shared floor-map snapshot for available_computers.
+
+The expensive part of the map (every computer and room, plus who holds each
+one right now) is built once and stored in the cache under the current
+"floor" version. It is also only valid until the next reservation starts or
+ends, since live status is derived from time. Per-viewer details (is_mine,
+icon choice) are laid on top by `overlay_for_user`.
+"""
+from django.core.cache import cache
+from django.forms.models import model_to_dict
+from django.utils import timezone
+
+from .availability import AvailabilityIndex, day_bounds, reservations_for_day
+from .cache_versions import get_version
+from .routers import primary
+from .models import Computer, StudyRoom, Reservation
+
+ICON_MAP = {
+    "computer": {
+        "available": "img/available.png",
+        "reserved":  "img/reserved.png",
+        "occupied":  "img/lock.png",
+        "repair":    "img/bsod.png",
+    },
+    "room": {
+        "available":    "img/sravailable.png",
+        "reserved":     "img/srreserved.png",
+        "occupied":     "img/sroccupied.png",
+        "out_of_order": "img/sroutoforder.png",
+    },
+}
+
+# Stored statuses that win over reservations
+OUT_OF_SERVICE = {"computer": "repair", "room": "out_of_order"}
+
+
+def _snapshot_key(version):
+    return f"link_up:floor:{version}"
+
+
+def build_snapshot(now=None):
+    now = timezone.localtime(now)
+    today = now.date()
+    reservations = list(reservations_for_day(
+        Reservation.objects.filter(end__gt=now).only(
+            "resource_type", "computer", "room", "user", "start", "end"), today))
+    index = AvailabilityIndex(today, reservations)
+
+    # Next moment a holder can change: a booking starting/ending, or midnight
+    _, midnight = day_bounds(today)
+    boundaries = [dt for res in reservations for dt in (res.start, res.end) if dt > now]
+    valid_until = min(boundaries + [midnight])
+
+    snapshot = {"valid_until": valid_until}
+    for resource_type, Model, key in (("computer", Computer, "computers"),
+                                      ("room", StudyRoom, "rooms")):
+        entries = []
+        for obj in Model.objects.order_by("name"):
+            d = model_to_dict(obj, fields=["id", "name", "x", "y", "status"])
+            d["holder"] = index.holder_at(resource_type, obj.id, now)
+            entries.append(d)
+        snapshot[key] = entries
+    return snapshot
+
+
+def get_snapshot(now=None):
+    """Return the cached snapshot for the current floor version, rebuilding if stale."""
+    now = now or timezone.now()
+    key = _snapshot_key(get_version("floor"))
+    snapshot = cache.get(key)
+    if snapshot is None or snapshot["valid_until"] <= now:
+        # Shared by every reader under this version, so never from a lagging replica
+        with primary():
+            snapshot = build_snapshot(now)
+        timeout = max(1, int((snapshot["valid_until"] - now).total_seconds()) + 1)
+        cache.set(key, snapshot, timeout)
+    return snapshot
+
+
+def resource_entry(resource_type, resource_id, now=None):
+    """Stored status and current holder for one resource, as in the snapshot."""
+    now = now or timezone.now()
+    Model = Computer if resource_type == "computer" else StudyRoom
+    status = Model.objects.filter(pk=resource_id).values_list("status", flat=True).first()
+    if status is None:
+        return None
+    holder = Reservation.objects.filter(
+        **Reservation.resource_lookup(resource_type, resource_id),
+        start__lte=now,
+        end__gt=now
+    ).values_list("user_id", flat=True).first()
+    return {"id": resource_id, "status": status, "holder": holder}
+
+
+def viewer_statuses(snapshot, user_id):
+    """{(type, id): (status, is_mine)} for every resource, as seen by user_id."""
+    statuses = {}
+    for resource_type, key in (("computer", "computers"), ("room", "rooms")):
+        for entry in snapshot[key]:
+            status, _, is_mine = resource_view(resource_type, entry, user_id)
+            statuses[(resource_type, entry["id"])] = (status, is_mine)
+    return statuses
+
+
+def resource_view(resource_type, entry, user_id):
+    """Status, icon and is_mine for one snapshot entry as seen by user_id."""
+    holder = entry["holder"]
+    is_mine = holder is not None and holder == user_id
+    if entry["status"] == OUT_OF_SERVICE[resource_type]:
+        status = entry["status"]
+    elif holder is not None:
+        status = "reserved" if is_mine else "occupied"
+    else:
+        status = "available"
+    return status, ICON_MAP[resource_type][status], is_mine
+
+
+def overlay_for_user(snapshot, user_id):
+    """Template-ready computer and room dicts for one viewer."""
+    result = {}
+    for resource_type, key in (("computer", "computers"), ("room", "rooms")):
+        items = []
+        for entry in snapshot[key]:
+            status, icon, is_mine = resource_view(resource_type, entry, user_id)
+            items.append({
+                "id": entry["id"],
+                "name": entry["name"],
+                "x": entry["x"],
+                "y": entry["y"],
+                "status": status,
+                "icon": icon,
+                "is_mine": is_mine,
+            })
+        result[key] = items
+    return result
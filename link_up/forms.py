@@ -6,6 +6,7 @@ from django.core.validators import RegexValidator
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
 from django.contrib.auth.models import User
+from django.urls import reverse
 
 
 # Define the custom validator for the phone format
@@ -28,7 +29,7 @@ class VenueForm(ModelForm):
     class Meta:
         model = Venue
         fields = ('name', 'address', 'city', 'state',
-                  'zip_code', 'phone', 'web', 'email_address')
+                  'zip_code', 'phone', 'web', 'email_address', 'capacity')
         labels = {
             'name': format_html("Name: Enter Your Venue Here (<span style='color:red;'>Required</span>)"),
             'address': format_html("Address: Enter the Address (<span style='color:red;'>Required</span>)"),
@@ -38,6 +39,7 @@ class VenueForm(ModelForm):
             'phone': format_html("Phone: Enter the phone number (<span style='color:red;'>Required</span>)"),
             'web': format_html("Web: Enter the web address"),
             'email_address': format_html("Email address: Enter email address (<span style='color:red;'>Required</span>)"),
+            'capacity': "Capacity: Maximum attendees (leave empty for no limit)",
         }
         widgets = {
             'name': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'UTRGV Venue Name'}),
@@ -48,6 +50,7 @@ class VenueForm(ModelForm):
             'phone': forms.TextInput(attrs={'class': 'form-control', 'type': 'tel', 'placeholder': '(956) 123-4567'}),
             'web': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'www.google.com'}),
             'email_address': forms.EmailInput(attrs={'class': 'form-control', 'placeholder': 'john.doe01@utrgv.edu'}),
+            'capacity': forms.NumberInput(attrs={'class': 'form-control', 'placeholder': '150'}),
         }
 
     # --- Override the clean method for the 'state' field ---
@@ -74,6 +77,59 @@ class VenueForm(ModelForm):
             attrs={'class': 'form-control', 'placeholder': 'john.doe01@utrgv.edu'}),
     )
 
+class AutocompleteSelect(forms.Select):
+    """
+    <select> that only renders the currently selected option; the rest are
+    fetched as you type from the autocomplete endpoint (static/js/autocomplete.js),
+    so the page doesn't grow with the table behind the field.
+    """
+
+    def __init__(self, url_name, attrs=None):
+        super().__init__(attrs)
+        self.url_name = url_name
+
+    class Media:
+        js = ('js/autocomplete.js',)
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs']['data-autocomplete-url'] = reverse(self.url_name)
+        return context
+
+    def _selected_pks(self, value):
+        # A re-rendered invalid form can carry anything the client POSTed
+        pk_field = self.choices.queryset.model._meta.pk
+        pks = []
+        for v in value:
+            if v in ('', None):
+                continue
+            try:
+                pks.append(pk_field.to_python(v))
+            except ValidationError:
+                continue
+        return pks
+
+    def optgroups(self, name, value, attrs=None):
+        selected = self._selected_pks(value)
+        options = [self.create_option(name, '', self.choices.field.empty_label or '',
+                                      not selected, 0)]
+        if selected:
+            for index, obj in enumerate(self.choices.queryset.filter(pk__in=selected), 1):
+                options.append(self.create_option(
+                    name, obj.pk, self.choices.field.label_from_instance(obj), True, index))
+        return [(None, options, 0)]
+
+
+def manager_label(user):
+    name = user.get_full_name()
+    return f"{name} ({user.username})" if name else user.username
+
+
+class ManagerChoiceField(forms.ModelChoiceField):
+    def label_from_instance(self, obj):
+        return manager_label(obj)
+
+
 class EventForm(ModelForm):
     # This line defines a Field instance directly on the form
     event_date = forms.DateTimeField(
@@ -88,11 +144,11 @@ class EventForm(ModelForm):
     )
 
     venue = forms.ModelChoiceField(
-        # This queryset fetches all available venues for the dropdown list
+        # Options come from the autocomplete endpoint, only the pick is rendered
         queryset=Venue.objects.all(),
         label=format_html(
             "Venue: Pick your Venue (<span style='color:red;'>Required</span>)"),
-        widget=forms.Select(attrs={'class': 'form-control'}),
+        widget=AutocompleteSelect('link_up:autocomplete-venues', attrs={'class': 'form-control'}),
         empty_label="--- Select a Venue ---"
     )
 
@@ -107,11 +163,13 @@ class EventForm(ModelForm):
     #         raise forms.ValidationError(
     #             "User with that username does not exist.")
 
-    manager = forms.ModelChoiceField(
-        queryset=User.objects.all(),
+    manager = ManagerChoiceField(
+        # Only accounts with a Manager profile can run events
+        queryset=User.objects.filter(manager__isnull=False),
         label=format_html(
             "Manager: Pick the Manager (<span style='color:red;'>Required</span>)"),
-        widget=forms.Select(attrs={'class': 'form-control'}),
+        widget=AutocompleteSelect('link_up:autocomplete-managers', attrs={'class': 'form-control'}),
+        empty_label="--- Select a Manager ---"
     )
 
     # def clean_image_name(self):
@@ -135,7 +193,7 @@ class EventForm(ModelForm):
     class Meta:
         model = Event
         fields = ('name', 'event_date', 'venue', 'manager',
-                  'email_address', 'description', 'image')
+                  'email_address', 'description', 'capacity', 'image')
         labels = {
             'name': format_html("Name: Enter Your Event Here (<span style='color:red;'>Required</span>)"),
             # 'event_date': format_html("Date: Enter the Date (<span style='color:red;'>Required</span>)"),
@@ -145,6 +203,7 @@ class EventForm(ModelForm):
             'description': format_html("Description code: Type a description of your event... (<span style='color:red;'>Required</span>)"),
             # 'attendees': format_html("Pick Attendees: (<span style='color:red;'>Required</span>)"),
             # 'image_name': format_html("Image Name: Enter the file name of your image"),
+            'capacity': "Capacity: Maximum attendees (leave empty to use the venue's capacity)",
             'image': "Upload Event Image",
         }
         widgets = {
@@ -154,6 +213,7 @@ class EventForm(ModelForm):
             'manager': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'vaquero01'}),
             'email_address': forms.EmailInput(attrs={'class': 'form-control', 'placeholder': 'contact@utrgv.edu'}),
             'description': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Please joing us our anual UTRGV CSCI fair for fun activities, and food.'}),
+            'capacity': forms.NumberInput(attrs={'class': 'form-control', 'placeholder': '100'}),
             # 'attendees': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Adrian Holovaty'}),
             'image_name': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'csci_fair_2025.jpg'}),
         }
@@ -0,0 +1,153 @@
+"""
+Per-user iCalendar (.ics) feeds of RSVP'd events and upcoming reservations.
+
+Feed URLs carry a signed token instead of a session, so calendar apps can
+subscribe without logging in. A feed's content is cached under the user's
+own "ics:<pk>" version (bumped by their RSVPs and bookings, see link_up.rsvp
+and link_up.signals), the "event_calendar" version (event and venue edits) and the
+date (yesterday's bookings drop off), and that same key is the ETag.
+"""
+import hashlib
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from operator import attrgetter
+
+from django.core import signing
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+
+from .cache_versions import get_version
+from .models import Computer, Event, Reservation, ReservationArchive, StudyRoom
+
+SALT = "link_up.ics"
+PRODID = "-//UTRGV Link-Up//Calendar Feed//EN"
+UID_DOMAIN = "utrgv-link-up"
+# Events only store a start time
+EVENT_DURATION = timedelta(hours=1)
+# Attended events older than this are left out of the feed
+EVENT_HISTORY = timedelta(days=30)
+FEED_TIMEOUT = 60 * 60 * 24
+
+
+def feed_scope(user_id):
+    return f"ics:{user_id}"
+
+
+def make_token(user):
+    return signing.Signer(salt=SALT).sign(str(user.pk))
+
+
+def user_id_from_token(token):
+    try:
+        return int(signing.Signer(salt=SALT).unsign(token))
+    except (signing.BadSignature, ValueError):
+        return None
+
+
+def feed_url(request, user):
+    return request.build_absolute_uri(
+        reverse("link_up:calendar-feed", args=[make_token(user)]))
+
+
+def feed_state(user_id):
+    """(cache key, etag) for the user's feed as of now."""
+    key = ":".join(str(p) for p in (
+        "link_up:ics", user_id, get_version(feed_scope(user_id)),
+        get_version("event_calendar"), timezone.localdate().isoformat(),
+    ))
+    return key, hashlib.md5(key.encode()).hexdigest()
+
+
+def cached_feed(key):
+    """(body, generated_at) or None."""
+    return cache.get(key)
+
+
+def store_feed(key, body, generated_at):
+    cache.set(key, (body, generated_at), FEED_TIMEOUT)
+
+
+# --- Rendering ---
+
+def _escape(text):
+    return (text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _fold(line):
+    # RFC 5545: lines longer than 75 octets continue on lines starting with a space
+    data = line.encode()
+    if len(data) <= 75:
+        return line + "\r\n"
+    parts = []
+    while data:
+        cut = 75 if not parts else 74
+        # Don't split a multi-byte character
+        while cut < len(data) and (data[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(data[:cut].decode())
+        data = data[cut:]
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _stamp(dt):
+    return dt.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _vevent(uid, start, end, summary, location="", description="", now=None):
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}@{UID_DOMAIN}",
+        f"DTSTAMP:{_stamp(now)}",
+        f"DTSTART:{_stamp(start)}",
+        f"DTEND:{_stamp(end)}",
+        f"SUMMARY:{_escape(summary)}",
+    ]
+    if location:
+        lines.append(f"LOCATION:{_escape(location)}")
+    if description:
+        lines.append(f"DESCRIPTION:{_escape(description)}")
+    lines.append("END:VEVENT")
+    return "".join(_fold(line) for line in lines)
+
+
+def generate_feed(user_id, now):
+    """Yield the feed in chunks: header, one VEVENT per item, footer."""
+    yield "".join(_fold(line) for line in (
+        "BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{PRODID}", "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH", "X-WR-CALNAME:UTRGV Link-Up",
+    ))
+
+    events = Event.objects.filter(
+        attendees__user_id=user_id, event_date__gte=now - EVENT_HISTORY,
+    ).select_related("venue").only(
+        "name", "event_date", "description", "venue__name", "venue__address", "venue__city",
+    ).order_by("event_date")
+    for event in events.iterator(chunk_size=200):
+        venue = event.venue
+        location = ", ".join(p for p in (venue.name, venue.address, venue.city) if p) if venue else ""
+        yield _vevent(f"event-{event.pk}", event.event_date, event.event_date + EVENT_DURATION,
+                      event.name, location, event.description, now)
+
+    # Today's and later bookings
+    today = timezone.make_aware(
+        datetime.combine(timezone.localdate(now), time(0, 0)), timezone.get_current_timezone())
+    # Bookings that already ended today have been moved to the archive
+    reservations = sorted([
+        *ReservationArchive.objects.filter(user_id=user_id, end__gt=today),
+        *Reservation.objects.filter(user_id=user_id, end__gt=today),
+    ], key=attrgetter("start"))
+    names = {
+        "computer": Computer.objects.only("name").in_bulk(
+            [r.resource_id for r in reservations if r.resource_type == "computer"]),
+        "room": StudyRoom.objects.only("name").in_bulk(
+            [r.resource_id for r in reservations if r.resource_type == "room"]),
+    }
+    for res in reservations:
+        obj = names[res.resource_type].get(res.resource_id)
+        label = obj.name if obj else f"{res.resource_type.title()} #{res.resource_id}"
+        uid = res.reservation_id if isinstance(res, ReservationArchive) else res.pk
+        yield _vevent(f"reservation-{uid}", res.start, res.end,
+                      f"Reserved: {label}", label, "", now)
+
+    yield _fold("END:VCALENDAR")
@@ -0,0 +1,283 @@
+import json
+import logging
+import math
+import random
+import statistics
+import threading
+import time as clock
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.utils import timezone
+
+from link_up.db import SQLITE_PROFILES, connection_settings
+from link_up.models import Computer, StudyRoom, Reservation
+
+# "reserve" books a slot and cancels it again, so it also covers api/cancel-reservation/;
+# "mixed" has every worker interleave reads (slots, map) with reserve/cancel writes
+SCENARIOS = ("slots", "reserve", "status", "map", "mixed")
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an unsorted list (0 for an empty one)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database with computers, rooms, users and "
+        "reservation history, drive the reservation endpoints at a given "
+        "concurrency through the Django test client, and print latency "
+        "percentiles, throughput and queries per request as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--computers", type=int, default=40)
+        parser.add_argument("--rooms", type=int, default=10)
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--history-days", type=int, default=30,
+                            help="Days of past reservations to seed (default: 30).")
+        parser.add_argument("--requests", type=int, default=200,
+                            help="Requests per scenario (default: 200).")
+        parser.add_argument("--concurrency", type=int, default=8,
+                            help="Worker threads per scenario (default: 8).")
+        parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                            help=f"Comma-separated subset of: {', '.join(SCENARIOS)}.")
+        parser.add_argument("--seed", type=int, default=1234)
+        parser.add_argument("--db-profiles", default=None,
+                            help="Comma-separated SQLite profiles from link_up.db to run "
+                                 "every scenario under, e.g. rollback,production "
+                                 "(default: the configured LINK_UP_DB_PROFILE).")
+        parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+
+    def handle(self, *args, **options):
+        scenarios = [s for s in options["scenarios"].split(",") if s]
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            self.stderr.write(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+            return
+        profiles = [p for p in (options["db_profiles"] or "").split(",") if p]
+        unknown = set(profiles) - set(SQLITE_PROFILES)
+        if unknown:
+            self.stderr.write(f"Unknown DB profiles: {', '.join(sorted(unknown))}")
+            return
+
+        # Expected 4xx answers (slot taken, already booked) would flood stderr
+        logging.getLogger("django.request").setLevel(logging.ERROR)
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            report = self.run(scenarios, profiles, options)
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                fh.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+    # --- Seeding ---
+
+    def seed(self, options, rng):
+        computers = Computer.objects.bulk_create([
+            Computer(name=f"PC-{i:04d}", x=rng.uniform(5, 95), y=rng.uniform(5, 95))
+            for i in range(options["computers"])
+        ])
+        rooms = StudyRoom.objects.bulk_create([
+            StudyRoom(name=f"SR-{i:03d}", x=rng.uniform(5, 95), y=rng.uniform(5, 95))
+            for i in range(options["rooms"])
+        ])
+        users = User.objects.bulk_create([
+            User(username=f"bench{i:05d}") for i in range(options["users"])
+        ])
+
+        # Past days: each resource booked for a random share of 8am-8pm hours
+        tz = timezone.get_current_timezone()
+        today = timezone.localdate()
+        history = []
+        resources = [("computer", c.id) for c in computers] + [("room", r.id) for r in rooms]
+        for days_ago in range(options["history_days"], 0, -1):
+            day = today - timedelta(days=days_ago)
+            for resource_type, pk in resources:
+                for hour in range(8, 20):
+                    if rng.random() < 0.4:
+                        start = timezone.make_aware(datetime.combine(day, time(hour, 0)), tz)
+                        history.append(Reservation(
+                            **Reservation.resource_lookup(resource_type, pk),
+                            user=rng.choice(users),
+                            start=start, end=start + timedelta(hours=1)))
+        Reservation.objects.bulk_create(history, batch_size=2000)
+        return computers, rooms, users, len(history)
+
+    # --- Driving ---
+
+    def _timed(self, endpoint, call):
+        with CaptureQueriesContext(connection) as queries:
+            started = clock.perf_counter()
+            resp = call()
+            elapsed = clock.perf_counter() - started
+        return endpoint, elapsed, len(queries), resp.status_code
+
+    def _step(self, scenario, client, rng, computers, rooms):
+        """One scenario iteration; returns a list of (endpoint, seconds, queries, status)."""
+        if scenario == "mixed":
+            scenario = rng.choice(("slots", "map", "reserve"))
+        if scenario == "map":
+            return [self._timed("available_computers", lambda: client.get("/available_computers/"))]
+
+        resource_type, pool = rng.choice((("computer", computers), ("room", rooms)))
+        if not pool:
+            resource_type, pool = ("computer", computers) if computers else ("room", rooms)
+        obj = rng.choice(pool)
+
+        if scenario == "slots":
+            body = json.dumps({"type": resource_type, "id": obj.id})
+            return [self._timed("api/slots/", lambda: client.post(
+                "/api/slots/", body, content_type="application/json"))]
+        if scenario == "status":
+            # Regular users flip a spot between available and reserved
+            body = json.dumps({"type": resource_type, "id": obj.id,
+                               "status": rng.choice(("reserved", "available"))})
+            return [self._timed("api/status/", lambda: client.post(
+                "/api/status/", body, content_type="application/json"))]
+
+        # reserve: book "now" and, when it worked, cancel so the next booking can go through
+        body = json.dumps({"type": resource_type, "id": obj.id, "reserve_now": True})
+        samples = [self._timed("api/reserve/", lambda: client.post(
+            "/api/reserve/", body, content_type="application/json"))]
+        if samples[0][3] == 200:
+            samples.append(self._timed("api/cancel-reservation/", lambda: client.post(
+                "/api/cancel-reservation/", "{}", content_type="application/json")))
+        return samples
+
+    def _summarize(self, samples):
+        latencies = [s[1] * 1000 for s in samples]
+        query_counts = [s[2] for s in samples]
+        status_codes = {}
+        for s in samples:
+            status_codes[str(s[3])] = status_codes.get(str(s[3]), 0) + 1
+        return {
+            "requests": len(samples),
+            "status_codes": status_codes,
+            "latency_ms": {
+                "mean": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+                "p50": round(percentile(latencies, 50), 3),
+                "p95": round(percentile(latencies, 95), 3),
+                "p99": round(percentile(latencies, 99), 3),
+                "max": round(max(latencies), 3) if latencies else 0.0,
+            },
+            "queries_per_request": {
+                "mean": round(statistics.fmean(query_counts), 2) if query_counts else 0.0,
+                "max": max(query_counts) if query_counts else 0,
+            },
+        }
+
+    def run_scenario(self, scenario, clients, options, computers, rooms):
+        per_worker = [options["requests"] // len(clients)] * len(clients)
+        for i in range(options["requests"] % len(clients)):
+            per_worker[i] += 1
+        samples = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(len(clients) + 1)
+
+        def worker(idx, client):
+            rng = random.Random(options["seed"] + idx)
+            results = []
+            try:
+                barrier.wait()
+                for _ in range(per_worker[idx]):
+                    results.extend(self._step(scenario, client, rng, computers, rooms))
+            finally:
+                connections.close_all()
+                with lock:
+                    samples.extend(results)
+
+        threads = [threading.Thread(target=worker, args=(i, c)) for i, c in enumerate(clients)]
+        for t in threads:
+            t.start()
+        barrier.wait()
+        started = clock.perf_counter()
+        for t in threads:
+            t.join()
+        wall = clock.perf_counter() - started
+
+        by_endpoint = {}
+        for sample in samples:
+            by_endpoint.setdefault(sample[0], []).append(sample)
+        return {
+            "requests": len(samples),
+            "wall_seconds": round(wall, 4),
+            "throughput_rps": round(len(samples) / wall, 2) if wall else 0.0,
+            "endpoints": {name: self._summarize(group) for name, group in sorted(by_endpoint.items())},
+        }
+
+    def use_profile(self, profile):
+        """Switch every new connection to an SQLite profile from link_up.db."""
+        connections.close_all()
+        settings.LINK_UP_DB_PROFILE = profile
+        for conn in connections.all():
+            conn.settings_dict.update(connection_settings(profile))
+        # Open one connection now so journal_mode is switched before the workers start
+        connection.ensure_connection()
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            return cursor.fetchone()[0]
+
+    def run(self, scenarios, profiles, options):
+        rng = random.Random(options["seed"])
+        computers, rooms, users, history = self.seed(options, rng)
+
+        # One logged-in client per worker thread, each a different student;
+        # server errors (e.g. "database is locked") are counted, not raised
+        concurrency = max(1, min(options["concurrency"], len(users)))
+        clients = []
+        for user in users[:concurrency]:
+            client = Client(raise_request_exception=False)
+            client.force_login(user)
+            clients.append(client)
+
+        def run_all():
+            return {scenario: self.run_scenario(scenario, clients, options, computers, rooms)
+                    for scenario in scenarios}
+
+        if profiles:
+            results = {}
+            for profile in profiles:
+                journal_mode = self.use_profile(profile)
+                results[profile] = {"journal_mode": journal_mode, "scenarios": run_all()}
+        else:
+            results = run_all()
+
+        return {
+            "config": {
+                "computers": len(computers),
+                "rooms": len(rooms),
+                "users": len(users),
+                "history_reservations": history,
+                "requests_per_scenario": options["requests"],
+                "concurrency": concurrency,
+                "seed": options["seed"],
+                "database": connection.vendor,
+                "db_profile": profiles or settings.LINK_UP_DB_PROFILE,
+                "started_at": timezone.now().isoformat(),
+            },
+            ("profiles" if profiles else "scenarios"): results,
+        }
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
+
+from link_up.models import Event, EventImageRendition
+from link_up.renditions import generate_renditions
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the WebP/JPEG renditions for event images that don't have "
+        "them yet (e.g. uploads from before renditions existed)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all", action="store_true",
+            help="Rebuild every event's renditions, not just missing ones.")
+
+    def handle(self, *args, **options):
+        events = Event.objects.exclude(image="").exclude(image=None)
+        if not options["all"]:
+            current = EventImageRendition.objects.filter(
+                event=OuterRef("pk"), source_name=OuterRef("image"))
+            events = events.filter(~Exists(current))
+        built = 0
+        for event_id in events.values_list("pk", flat=True).iterator():
+            try:
+                built += generate_renditions(event_id)
+            except OSError as exc:
+                self.stderr.write(f"Event {event_id}: {exc}")
+        self.stdout.write(f"Built {built} rendition(s).")
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from link_up.expiry import ARCHIVE_BATCH_SIZE, expire_reservations, next_expiry
+
+
+class Command(BaseCommand):
+    help = (
+        "Move finished reservations into the archive table. Runs as a "
+        "long-lived scheduler that sleeps until the next Reservation.end, "
+        "unless --once is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Expire what has already ended and exit.")
+        parser.add_argument(
+            "--max-sleep", type=float, default=300.0,
+            help="Upper bound in seconds between wake-ups, so bookings made "
+                 "while sleeping are still picked up (default: 300).")
+        parser.add_argument(
+            "--batch-size", type=int, default=ARCHIVE_BATCH_SIZE,
+            help=f"Reservations archived per transaction (default: {ARCHIVE_BATCH_SIZE}).")
+
+    def handle(self, *args, **options):
+        max_sleep = options["max_sleep"]
+        while True:
+            now = timezone.now()
+            expired = expire_reservations(now, options["batch_size"])
+            if expired:
+                self.stdout.write(f"Archived {expired} reservation(s) at {now.isoformat()}")
+            if options["once"]:
+                return
+
+            # Sleep until the next booking ends (or the poll cap, whichever is sooner)
+            next_end = next_expiry(now)
+            close_old_connections()
+            delay = max_sleep
+            if next_end is not None:
+                delay = min(max_sleep, (next_end - timezone.now()).total_seconds())
+            time.sleep(max(delay, 0.0))
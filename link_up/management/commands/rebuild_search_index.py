@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from link_up.models import Event, Venue
+from link_up.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the event/venue full-text search index from scratch, e.g. "
+        "after bulk_create/update() loads that skipped the sync signals."
+    )
+
+    def handle(self, *args, **options):
+        rebuild_index()
+        self.stdout.write(
+            f"Indexed {Event.objects.count()} event(s) and {Venue.objects.count()} venue(s).")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from link_up.utilization import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the hourly utilization rollups from the reservation archive "
+        "and live table, e.g. after bulk_create loads that skipped the signals. "
+        "Minutes given back by past cancellations can't be recovered and are "
+        "counted as booked."
+    )
+
+    def handle(self, *args, **options):
+        buckets = rebuild()
+        self.stdout.write(f"Rebuilt {buckets} utilization bucket(s).")
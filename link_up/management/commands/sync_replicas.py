@@ -0,0 +1,32 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from link_up.routers import PRIMARY, replicas
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database onto every LINK_UP_READ_REPLICAS file "
+        "with SQLite's online backup API (readers of the primary aren't blocked)."
+    )
+
+    def handle(self, *args, **options):
+        aliases = replicas()
+        if not aliases:
+            raise CommandError("LINK_UP_READ_REPLICAS is empty, nothing to sync.")
+        source = sqlite3.connect(settings.DATABASES[PRIMARY]["NAME"])
+        try:
+            for alias in aliases:
+                # Drop our own open handle first so the copy isn't fighting it
+                connections[alias].close()
+                target = sqlite3.connect(settings.DATABASES[alias]["NAME"])
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f"{alias}: synced from {PRIMARY}.")
+        finally:
+            source.close()
@@ -0,0 +1,160 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import routers
+
+logger = logging.getLogger("link_up.metrics")
+
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+
+
+def sql_shape(sql):
+    """Collapse a parameterized statement to its shape (IN-lists of any length match)."""
+    return _IN_LIST.sub("IN (...)", _WHITESPACE.sub(" ", sql).strip())
+
+
+class _QueryRecorder:
+    """connection.execute_wrapper hook counting queries, DB time and SQL shapes."""
+
+    def __init__(self):
+        self.count = 0
+        self.db_time = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.count += 1
+            self.shapes[sql_shape(sql)] += 1
+
+    def repeated(self, threshold):
+        return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+
+
+class RequestMetrics:
+    """Per-URL-name aggregates, shared by every request in this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, route, wall, queries, db_time, repeated):
+        with self._lock:
+            stats = self._routes.setdefault(route, {
+                "requests": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "total_queries": 0, "max_queries": 0, "total_db_ms": 0.0,
+                "n_plus_one_requests": 0, "repeated_shapes": Counter(),
+            })
+            stats["requests"] += 1
+            stats["total_ms"] += wall * 1000
+            stats["max_ms"] = max(stats["max_ms"], wall * 1000)
+            stats["total_queries"] += queries
+            stats["max_queries"] = max(stats["max_queries"], queries)
+            stats["total_db_ms"] += db_time * 1000
+            if repeated:
+                stats["n_plus_one_requests"] += 1
+                for shape, n in repeated.items():
+                    stats["repeated_shapes"][shape] = max(stats["repeated_shapes"][shape], n)
+
+    def snapshot(self):
+        with self._lock:
+            routes = {}
+            for route, s in self._routes.items():
+                n = s["requests"]
+                routes[route] = {
+                    "requests": n,
+                    "mean_ms": round(s["total_ms"] / n, 3),
+                    "max_ms": round(s["max_ms"], 3),
+                    "mean_queries": round(s["total_queries"] / n, 2),
+                    "max_queries": s["max_queries"],
+                    "mean_db_ms": round(s["total_db_ms"] / n, 3),
+                    "n_plus_one_requests": s["n_plus_one_requests"],
+                    # Worst repeat count seen per shape, most repeated first
+                    "repeated_sql": [
+                        {"sql": shape, "max_repeats": count}
+                        for shape, count in s["repeated_shapes"].most_common(5)
+                    ],
+                }
+            return routes
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+request_metrics = RequestMetrics()
+
+
+class RequestMetricsMiddleware:
+    """
+    Opt-in (settings.LINK_UP_REQUEST_METRICS) per-request instrumentation:
+    wall time, query count and DB time per URL name, plus N+1 detection
+    when one SQL shape runs LINK_UP_N_PLUS_ONE_THRESHOLD times or more in
+    a single request. Logs one line per request and feeds the staff-only
+    api/metrics/ endpoint.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "LINK_UP_REQUEST_METRICS", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = getattr(settings, "LINK_UP_N_PLUS_ONE_THRESHOLD", 5)
+
+    def __call__(self, request):
+        recorder = _QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(recorder))
+            response = self.get_response(request)
+        wall = time.perf_counter() - started
+
+        match = getattr(request, "resolver_match", None)
+        route = (match.view_name if match else None) or "<unresolved>"
+        repeated = recorder.repeated(self.threshold)
+        request_metrics.record(route, wall, recorder.count, recorder.db_time, repeated)
+
+        log = logger.warning if repeated else logger.info
+        log(
+            "route=%s method=%s status=%s ms=%.1f queries=%d db_ms=%.1f n_plus_one=%d",
+            route, request.method, response.status_code, wall * 1000,
+            recorder.count, recorder.db_time * 1000, sum(repeated.values()),
+        )
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Sticky primary after writes (see link_up.routers): a request that wrote
+    sets a short-lived cookie, and requests carrying it skip the replicas.
+    Does nothing unless LINK_UP_READ_REPLICAS lists at least one alias.
+    """
+
+    COOKIE = "link_up_primary"
+
+    def __init__(self, get_response):
+        if not routers.replicas():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sticky_seconds = getattr(settings, "LINK_UP_STICKY_PRIMARY_SECONDS", 10)
+
+    def __call__(self, request):
+        routers.start_request()
+        request.pin_to_primary = self.COOKIE in request.COOKIES
+        response = self.get_response(request)
+        if routers.request_wrote():
+            response.set_cookie(self.COOKIE, "1", max_age=self.sticky_seconds,
+                                httponly=True, samesite="Lax")
+        return response
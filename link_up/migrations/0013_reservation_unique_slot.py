@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('link_up', '0012_remove_event_image_name_event_image'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='reservation',
+            constraint=models.UniqueConstraint(fields=('resource_type', 'resource_id', 'start'), name='unique_reservation_slot_start'),
+        ),
+    ]
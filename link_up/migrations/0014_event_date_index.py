@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('link_up', '0013_reservation_unique_slot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['event_date', 'id'], name='link_up_eve_event_d_85a131_idx'),
+        ),
+    ]
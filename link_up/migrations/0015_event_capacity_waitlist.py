@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_attendee_count(apps, schema_editor):
+    Event = apps.get_model('link_up', 'Event')
+    through = Event.attendees.through
+    counts = through.objects.filter(event=OuterRef('pk')).order_by().values(
+        'event').annotate(n=Count('*')).values('n')
+    Event.objects.update(attendee_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('link_up', '0014_event_date_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='attendee_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='capacity',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Capacity'),
+        ),
+        migrations.AddField(
+            model_name='venue',
+            name='capacity',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Capacity'),
+        ),
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist', to='link_up.event')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='link_up.student')),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'constraints': [models.UniqueConstraint(fields=('event', 'student'), name='unique_waitlist_entry')],
+            },
+        ),
+        migrations.RunPython(backfill_attendee_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('link_up', '0015_event_capacity_waitlist'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventImageRendition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_name', models.CharField(max_length=255)),
+                ('format', models.CharField(choices=[('webp', 'WebP'), ('jpeg', 'JPEG')], max_length=4)),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('image', models.ImageField(upload_to='events-list/renditions/')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='renditions', to='link_up.event')),
+            ],
+            options={
+                'ordering': ['width'],
+                'constraints': [models.UniqueConstraint(fields=('event', 'format', 'width'), name='unique_event_rendition')],
+            },
+        ),
+    ]
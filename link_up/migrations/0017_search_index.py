@@ -0,0 +1,25 @@
+from django.db import migrations
+
+# rowid = pk * 2 for events, pk * 2 + 1 for venues (see link_up.search)
+CREATE_INDEX = """
+CREATE VIRTUAL TABLE link_up_search USING fts5(
+    title, body, place,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+INSERT INTO link_up_search (rowid, title, body, place)
+    SELECT id * 2, name, description, '' FROM link_up_event;
+INSERT INTO link_up_search (rowid, title, body, place)
+    SELECT id * 2 + 1, name, address, city FROM link_up_venue;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('link_up', '0016_event_image_rendition'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_INDEX, "DROP TABLE link_up_search;"),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('link_up', '0017_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReservationArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reservation_id', models.PositiveIntegerField()),
+                ('resource_type', models.CharField(choices=[('computer', 'Computer'), ('room', 'Study Room')], max_length=10)),
+                ('resource_id', models.PositiveIntegerField()),
+                ('start', models.DateTimeField()),
+                ('end', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_reservations', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['start'], name='link_up_res_start_7721f2_idx'), models.Index(fields=['user', 'start'], name='link_up_res_user_id_82d5df_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:27
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def hour_spans(start, end):
+    # Frozen copy of link_up.utilization.hour_spans as of this migration
+    start = timezone.localtime(start)
+    end = timezone.localtime(end)
+    hour = start.replace(minute=0, second=0, microsecond=0)
+    while hour < end:
+        following = timezone.localtime(hour + timedelta(hours=1))
+        minutes = round((min(end, following) - max(start, hour)).total_seconds() / 60)
+        if minutes > 0:
+            yield hour, minutes
+        hour = following
+
+
+def backfill_buckets(apps, schema_editor):
+    Bucket = apps.get_model('link_up', 'UtilizationBucket')
+    totals = defaultdict(int)
+    for name in ('ReservationArchive', 'Reservation'):
+        rows = apps.get_model('link_up', name).objects.values_list(
+            'resource_type', 'resource_id', 'start', 'end')
+        for resource_type, resource_id, start, end in rows.iterator():
+            for hour, minutes in hour_spans(start, end):
+                totals[resource_type, resource_id, hour] += minutes
+    Bucket.objects.bulk_create([
+        Bucket(resource_type=resource_type, resource_id=resource_id, hour=hour,
+               weekday=hour.weekday(), hour_of_day=hour.hour, booked_minutes=minutes)
+        for (resource_type, resource_id, hour), minutes in totals.items()
+    ], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('link_up', '0018_reservation_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UtilizationBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource_type', models.CharField(choices=[('computer', 'Computer'), ('room', 'Study Room')], max_length=10)),
+                ('resource_id', models.PositiveIntegerField()),
+                ('hour', models.DateTimeField()),
+                ('weekday', models.PositiveSmallIntegerField()),
+                ('hour_of_day', models.PositiveSmallIntegerField()),
+                ('booked_minutes', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hour'], name='link_up_uti_hour_573d45_idx')],
+                'constraints': [models.UniqueConstraint(fields=('resource_type', 'resource_id', 'hour'), name='unique_utilization_bucket')],
+            },
+        ),
+        migrations.RunPython(backfill_buckets, migrations.RunPython.noop),
+    ]
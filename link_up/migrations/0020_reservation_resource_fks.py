@@ -0,0 +1,88 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Exists, F, OuterRef
+
+
+def copy_resource_ids(apps, schema_editor):
+    Reservation = apps.get_model('link_up', 'Reservation')
+    ReservationArchive = apps.get_model('link_up', 'ReservationArchive')
+    for resource_type, field, model in (('computer', 'computer', 'Computer'),
+                                        ('room', 'room', 'StudyRoom')):
+        rows = Reservation.objects.filter(resource_type=resource_type)
+        # Bookings whose seat/room is gone can't get an FK; keep them as history
+        orphans = rows.filter(~Exists(
+            apps.get_model('link_up', model).objects.filter(pk=OuterRef('resource_id'))))
+        ReservationArchive.objects.bulk_create([
+            ReservationArchive(
+                reservation_id=res.pk, resource_type=res.resource_type,
+                resource_id=res.resource_id, user_id=res.user_id,
+                start=res.start, end=res.end)
+            for res in orphans
+        ], batch_size=2000)
+        orphans.delete()
+        rows.update(**{f'{field}_id': F('resource_id')})
+
+
+def restore_resource_ids(apps, schema_editor):
+    Reservation = apps.get_model('link_up', 'Reservation')
+    Reservation.objects.filter(resource_type='computer').update(resource_id=F('computer_id'))
+    Reservation.objects.filter(resource_type='room').update(resource_id=F('room_id'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('link_up', '0019_utilization_bucket'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='computer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='link_up.computer'),
+        ),
+        migrations.AddField(
+            model_name='reservation',
+            name='room',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='link_up.studyroom'),
+        ),
+        # Nullable, so unapplying can re-add the column and refill it before NOT NULL
+        migrations.AlterField(
+            model_name='reservation',
+            name='resource_id',
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.RunPython(copy_resource_ids, restore_resource_ids),
+        migrations.RemoveConstraint(
+            model_name='reservation',
+            name='unique_reservation_slot_start',
+        ),
+        migrations.RemoveIndex(
+            model_name='reservation',
+            name='link_up_res_resourc_470840_idx',
+        ),
+        migrations.RemoveField(
+            model_name='reservation',
+            name='resource_id',
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['end'], name='link_up_res_end_e1e01d_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='reservation',
+            constraint=models.CheckConstraint(condition=models.Q(models.Q(('computer__isnull', False), ('resource_type', 'computer'), ('room__isnull', True)), models.Q(('computer__isnull', True), ('resource_type', 'room'), ('room__isnull', False)), _connector='OR'), name='reservation_one_resource'),
+        ),
+        migrations.AddConstraint(
+            model_name='reservation',
+            constraint=models.UniqueConstraint(fields=('computer', 'start'), name='unique_computer_slot_start'),
+        ),
+        migrations.AddConstraint(
+            model_name='reservation',
+            constraint=models.UniqueConstraint(fields=('room', 'start'), name='unique_room_slot_start'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('link_up', '0020_reservation_resource_fks'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reservationarchive',
+            name='reservation_id',
+            field=models.PositiveIntegerField(unique=True),
+        ),
+    ]
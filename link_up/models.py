@@ -57,6 +57,8 @@ class Venue(models.Model):
     phone = models.CharField('Contact Phone', max_length=14)
     web = models.URLField('Website Address', blank=True)
     email_address = models.EmailField('Email Address')
+    # Empty means no seat limit
+    capacity = models.PositiveIntegerField('Capacity', null=True, blank=True)
 
     owner = models.ForeignKey(
         User, on_delete=models.CASCADE, null=True, blank=True)
@@ -104,9 +106,19 @@ class Event(models.Model):
     email_address = models.EmailField('Email Address')
     description = models.TextField(blank=True)
     attendees = models.ManyToManyField(Student, blank=True)
+    # Overrides the venue's capacity; both empty means unlimited
+    capacity = models.PositiveIntegerField('Capacity', null=True, blank=True)
+    # Kept in step with attendees by link_up.rsvp (and signals for other writes)
+    attendee_count = models.PositiveIntegerField(default=0, editable=False)
     # image_name = models.CharField(max_length=60)
     image = models.ImageField(upload_to='events-list/', blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # Date-window filters and keyset pagination on (event_date, id)
+            models.Index(fields=["event_date", "id"]),
+        ]
+
     def __str__(self):
         return self.name
     
@@ -114,18 +126,99 @@ class Event(models.Model):
     def is_past(self):
         return self.event_date < timezone.now()
 
+    def _renditions(self, fmt):
+        # Uses the prefetched renditions (see _event_page); ones left over from
+        # a replaced image are ignored until the new set is ready
+        return [r for r in self.renditions.all()
+                if r.format == fmt and r.source_name == self.image.name]
+
+    def _srcset(self, fmt):
+        return ", ".join(f"{r.image.url} {r.width}w" for r in self._renditions(fmt))
+
+    @property
+    def webp_srcset(self):
+        return self._srcset("webp")
+
+    @property
+    def jpeg_srcset(self):
+        return self._srcset("jpeg")
+
+    @property
+    def card_image(self):
+        """Smallest JPEG rendition wide enough for a card (400px), else the widest."""
+        jpegs = self._renditions("jpeg")
+        return next((r for r in jpegs if r.width >= 400), jpegs[-1] if jpegs else None)
+
+    @property
+    def seat_limit(self):
+        if self.capacity is not None:
+            return self.capacity
+        return self.venue.capacity if self.venue_id else None
+
+    @property
+    def is_full(self):
+        limit = self.seat_limit
+        return limit is not None and self.attendee_count >= limit
+
     def __str__(self):
         return self.name
 
 
+class EventImageRendition(models.Model):
+    """A downscaled copy of Event.image, made by link_up.renditions."""
+    FORMAT_CHOICES = [
+        ("webp", "WebP"),
+        ("jpeg", "JPEG"),
+    ]
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="renditions")
+    # Name of the upload this was made from, so a replaced image is noticed
+    source_name = models.CharField(max_length=255)
+    format = models.CharField(max_length=4, choices=FORMAT_CHOICES)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    image = models.ImageField(upload_to='events-list/renditions/')
+
+    class Meta:
+        ordering = ["width"]
+        constraints = [
+            models.UniqueConstraint(fields=["event", "format", "width"],
+                                    name="unique_event_rendition"),
+        ]
+
+    def __str__(self):
+        return f"{self.event} {self.width}w {self.format}"
+
+
+class WaitlistEntry(models.Model):
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="waitlist")
+    student = models.ForeignKey(Student, on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["created_at", "id"]
+        constraints = [
+            models.UniqueConstraint(fields=["event", "student"], name="unique_waitlist_entry"),
+        ]
+
+    def __str__(self):
+        return f"{self.student} waiting for {self.event}"
+
+
 class Reservation(models.Model):
     RESOURCE_CHOICES = [
         ("computer", "Computer"),
         ("room", "Study Room"),
     ]
+    # Each resource_type is also the name of the FK holding that kind of resource
+    RESOURCE_FIELDS = ("computer", "room")
 
     resource_type = models.CharField(max_length=10, choices=RESOURCE_CHOICES)
-    resource_id = models.PositiveIntegerField()
+    # Exactly one of these is set, matching resource_type (see the check constraint)
+    computer = models.ForeignKey(
+        Computer, on_delete=models.CASCADE, null=True, blank=True, related_name="reservations")
+    room = models.ForeignKey(
+        StudyRoom, on_delete=models.CASCADE, null=True, blank=True, related_name="reservations")
     user = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="reservations")
     start = models.DateTimeField()
@@ -133,11 +226,101 @@ class Reservation(models.Model):
 
     class Meta:
         indexes = [
-            models.Index(
-                fields=["resource_type", "resource_id", "start", "end"]),
             models.Index(fields=["user", "start", "end"]),
+            # Expiry, next_expiry and the floor snapshot all range over end
+            models.Index(fields=["end"]),
         ]
+        constraints = [
+            models.CheckConstraint(
+                condition=(
+                    models.Q(resource_type="computer", computer__isnull=False, room__isnull=True)
+                    | models.Q(resource_type="room", room__isnull=False, computer__isnull=True)
+                ),
+                name="reservation_one_resource"),
+            # Reject two bookings with the same start on one resource (the
+            # race the booking check can't see). Overlaps with different
+            # starts are only stopped by create_reservation's check inside its
+            # IMMEDIATE transaction. These also index the per-resource overlap
+            # checks; NULLs never collide, so computer and room bookings don't
+            # interfere.
+            models.UniqueConstraint(
+                fields=["computer", "start"], name="unique_computer_slot_start"),
+            models.UniqueConstraint(
+                fields=["room", "start"], name="unique_room_slot_start"),
+        ]
+
+    @staticmethod
+    def resource_lookup(resource_type, resource_id):
+        """
+        Filter/create kwargs for the bookings of one computer or room;
+        resource_type must already be one of RESOURCE_FIELDS.
+        """
+        return {"resource_type": resource_type, f"{resource_type}_id": resource_id}
+
+    @property
+    def resource_id(self):
+        return self.computer_id if self.resource_type == "computer" else self.room_id
+
+    @property
+    def resource(self):
+        return self.computer if self.resource_type == "computer" else self.room
 
     def __str__(self):
         start_str = self.start.strftime("%Y-%m-%d %H:%M")
         return f"{self.get_resource_type_display()} {self.resource_id} @ {start_str} for {self.user}"
+
+
+class ReservationArchive(models.Model):
+    """
+    Append-only history of finished reservations. The expiry job moves rows
+    here out of Reservation, so the hot table only holds current and future
+    bookings and its overlap checks stay small.
+    """
+    # Reservation ids are AUTOINCREMENT, never reused, so one row per booking
+    reservation_id = models.PositiveIntegerField(unique=True)
+    resource_type = models.CharField(max_length=10, choices=Reservation.RESOURCE_CHOICES)
+    resource_id = models.PositiveIntegerField()
+    # History outlives accounts, so a deleted user just leaves the row anonymous
+    user = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, related_name="archived_reservations")
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["start"]),
+            models.Index(fields=["user", "start"]),
+        ]
+
+    def __str__(self):
+        start_str = self.start.strftime("%Y-%m-%d %H:%M")
+        return f"{self.get_resource_type_display()} {self.resource_id} @ {start_str} for {self.user} (archived)"
+
+
+class UtilizationBucket(models.Model):
+    """
+    Booked minutes for one computer or room in one local clock hour, kept
+    up to date by link_up.utilization as reservations come and go.
+    weekday (0 = Monday) and hour_of_day are the local values of `hour`,
+    stored so the heatmap can group on them directly.
+    """
+    resource_type = models.CharField(max_length=10, choices=Reservation.RESOURCE_CHOICES)
+    resource_id = models.PositiveIntegerField()
+    hour = models.DateTimeField()
+    weekday = models.PositiveSmallIntegerField()
+    hour_of_day = models.PositiveSmallIntegerField()
+    booked_minutes = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["hour"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["resource_type", "resource_id", "hour"],
+                name="unique_utilization_bucket"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_resource_type_display()} {self.resource_id} @ {self.hour:%Y-%m-%d %H}:00: {self.booked_minutes} min"
@@ -0,0 +1,111 @@
+"""
+Responsive copies of Event.image uploads.
+
+Saving an event whose image has no renditions yet queues a job (after the
+transaction commits) on a small thread pool, so add_events/update_event
+don't wait on Pillow. The job writes a WebP and a JPEG copy at each of
+RENDITION_WIDTHS no wider than the original and swaps them in; until then
+the template simply falls back to the original file.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from .cache_versions import bump_version
+from .models import Event, EventImageRendition
+
+logger = logging.getLogger(__name__)
+
+RENDITION_WIDTHS = (320, 640, 1024)
+QUALITY = {"webp": 80, "jpeg": 82}
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="renditions")
+
+
+def _encode(image, fmt):
+    buffer = BytesIO()
+    if fmt == "webp":
+        image.save(buffer, "WEBP", quality=QUALITY[fmt], method=4)
+    else:
+        image.save(buffer, "JPEG", quality=QUALITY[fmt], optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def _resized(original, width):
+    if width >= original.width:
+        return original
+    height = max(1, round(original.height * width / original.width))
+    return original.resize((width, height), Image.LANCZOS)
+
+
+def generate_renditions(event_id):
+    """Build (or rebuild) the renditions for an event's current image."""
+    event = Event.objects.filter(pk=event_id).first()
+    if event is None or not event.image:
+        return 0
+    source_name = event.image.name
+
+    with event.image.open("rb") as fh:
+        original = ImageOps.exif_transpose(Image.open(fh))
+        original = original.convert("RGB")
+
+    # Widths up to the original's; tiny uploads still get one copy each
+    widths = [w for w in RENDITION_WIDTHS if w <= original.width] or [original.width]
+    stem = os.path.splitext(os.path.basename(source_name))[0]
+    made = []
+    for width in widths:
+        image = _resized(original, width)
+        for fmt in ("webp", "jpeg"):
+            rendition = EventImageRendition(
+                event_id=event_id, source_name=source_name, format=fmt,
+                width=image.width, height=image.height)
+            ext = "webp" if fmt == "webp" else "jpg"
+            rendition.image.save(f"{stem}-{image.width}w.{ext}",
+                                 ContentFile(_encode(image, fmt)), save=False)
+            made.append(rendition)
+
+    unused = []
+    with transaction.atomic():
+        # The image may have been replaced while we were busy
+        if Event.objects.filter(pk=event_id, image=source_name).exists():
+            # Their files are removed by signals.delete_rendition_file
+            EventImageRendition.objects.filter(event_id=event_id).delete()
+            EventImageRendition.objects.bulk_create(made)
+        else:
+            unused, made = made, []
+    for rendition in unused:
+        rendition.image.delete(save=False)
+    if made:
+        bump_version("events")
+    return len(made)
+
+
+def _run(event_id):
+    try:
+        generate_renditions(event_id)
+    except Exception:
+        logger.exception("Could not build image renditions for event %s", event_id)
+
+
+def _run_in_pool(event_id):
+    # Only the worker threads own their connections; in sync mode _run shares
+    # the caller's
+    try:
+        _run(event_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_renditions(event):
+    """Queue rendition generation for event once the current transaction commits."""
+    event_id = event.pk
+    if getattr(settings, "LINK_UP_RENDITIONS_SYNC", False):
+        transaction.on_commit(lambda: _run(event_id))
+    else:
+        transaction.on_commit(lambda: _executor.submit(_run_in_pool, event_id))
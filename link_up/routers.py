@@ -0,0 +1,108 @@
+"""
+Read-replica routing.
+
+Views opt in with @read_replica; only while one of those runs (and the
+request isn't pinned to the primary) do reads go to a replica: one alias
+from settings.LINK_UP_READ_REPLICAS, picked at random once per request so
+all of the request's reads see the same sync point. Everything else, and every write, uses
+"default". ReplicaRoutingMiddleware pins a browser to the primary for
+LINK_UP_STICKY_PRIMARY_SECONDS after any request that wrote, so a student
+sees their own booking on the very next page even if the replicas lag.
+
+Code that fills a version-keyed cache should read inside primary(): the
+version is bumped by the write, and a lagging replica would otherwise
+cache the old data under the new version.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+PRIMARY = "default"
+
+# Alias reads should use right now; None means the primary
+_intent = ContextVar("link_up_db_intent", default=None)
+_wrote = ContextVar("link_up_db_wrote", default=False)
+
+
+def replicas():
+    return getattr(settings, "LINK_UP_READ_REPLICAS", [])
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _intent.get() or PRIMARY
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas are copies of the primary, so objects from any of them relate
+        aliases = {PRIMARY, *replicas()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get the primary's schema by copy (manage.py sync_replicas)
+        return db == PRIMARY
+
+
+@contextmanager
+def db_intent(alias):
+    token = _intent.set(alias)
+    try:
+        yield
+    finally:
+        _intent.reset(token)
+
+
+def primary():
+    """Force reads in this block onto the primary."""
+    return db_intent(PRIMARY)
+
+
+def read_replica(view):
+    """Let a read-mostly view's queries go to the replicas."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        pool = replicas()
+        if pool and not getattr(request, "pin_to_primary", False):
+            alias = random.choice(pool)
+        else:
+            alias = PRIMARY
+        with db_intent(alias):
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+def iterate_with_intent(iterable):
+    """
+    Iterate reading from the alias active now (same replica as the rest of
+    the request), for generators a StreamingHttpResponse consumes after the
+    view returned.
+    """
+    # Captured here, not in the generator body, which only starts running later
+    alias = _intent.get()
+
+    def items():
+        iterator = iter(iterable)
+        while True:
+            with db_intent(alias):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+    return items()
+
+
+def start_request():
+    _wrote.set(False)
+
+
+def request_wrote():
+    return _wrote.get()
@@ -0,0 +1,130 @@
+"""
+Joining and leaving events with seat limits.
+
+Event.attendee_count is the seat counter. A seat is only ever taken by a
+conditional UPDATE ("attendee_count + 1 WHERE there is still room"), so two
+students racing for the last seat can't both get it: the database applies
+the updates one after the other and the second one matches no row. Whoever
+doesn't get a seat lands on the waitlist, and the first student waiting is
+moved up whenever a seat frees.
+
+Everything here writes the through table and the counter directly, which
+skips m2m_changed/post_save: callers of the bulk functions bump the
+"events" cache version themselves, join_event/leave_event do it for you.
+"""
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .cache_versions import bump_version
+from .ics import feed_scope
+from .models import Event, WaitlistEntry
+
+Attendance = Event.attendees.through
+
+ATTENDING = "attending"
+WAITLISTED = "waitlisted"
+NOT_GOING = "none"
+
+
+def _has_room():
+    # The event's own capacity wins, else the venue's; neither means unlimited
+    return (
+        Q(capacity__isnull=False, attendee_count__lt=F("capacity"))
+        | Q(capacity__isnull=True, venue__capacity__isnull=True)
+        | Q(capacity__isnull=True, attendee_count__lt=F("venue__capacity"))
+    )
+
+
+def _take_seat(event_id):
+    return Event.objects.filter(pk=event_id).filter(_has_room()).update(
+        attendee_count=F("attendee_count") + 1) == 1
+
+
+def fill_from_waitlist(event_ids):
+    """Fill free seats from the front of each event's waitlist."""
+    for event_id in event_ids:
+        for entry in WaitlistEntry.objects.filter(event_id=event_id):
+            if not _take_seat(event_id):
+                break
+            Attendance.objects.create(event_id=event_id, student_id=entry.student_id)
+            entry.delete()
+            bump_version(feed_scope(entry.student_id))
+
+
+def join_events(student, event_ids):
+    """
+    Try to get student a seat at each of event_ids (past ones are ignored).
+    Returns {event_id: ATTENDING | WAITLISTED} for the events that took part.
+    """
+    with transaction.atomic():
+        joinable = set(Event.objects.filter(
+            pk__in=event_ids, event_date__gte=timezone.now()).values_list("pk", flat=True))
+        already = set(Attendance.objects.filter(
+            student=student, event_id__in=joinable).values_list("event_id", flat=True))
+        result = dict.fromkeys(already, ATTENDING)
+
+        # One conditional UPDATE per event: which ones matched is the answer
+        admitted = [pk for pk in sorted(joinable - already) if _take_seat(pk)]
+        Attendance.objects.bulk_create(
+            [Attendance(event_id=pk, student=student) for pk in admitted])
+        WaitlistEntry.objects.filter(student=student, event_id__in=admitted).delete()
+        result.update(dict.fromkeys(admitted, ATTENDING))
+
+        waiting = joinable - already - set(admitted)
+        WaitlistEntry.objects.bulk_create(
+            [WaitlistEntry(event_id=pk, student=student) for pk in sorted(waiting)],
+            ignore_conflicts=True)
+        result.update(dict.fromkeys(waiting, WAITLISTED))
+    if admitted:
+        bump_version(feed_scope(student.pk))
+    return result
+
+
+def leave_events(student, event_ids):
+    """Drop student's seat or waitlist spot at each event; returns how many seats freed."""
+    with transaction.atomic():
+        freed = list(Attendance.objects.filter(
+            student=student, event_id__in=event_ids).values_list("event_id", flat=True))
+        if freed:
+            Attendance.objects.filter(student=student, event_id__in=freed).delete()
+            # Clamp at zero: the counter may have drifted (see recount_attendees)
+            Event.objects.filter(pk__in=freed).update(
+                attendee_count=Greatest(F("attendee_count") - 1, Value(0)))
+        WaitlistEntry.objects.filter(student=student, event_id__in=event_ids).delete()
+        fill_from_waitlist(freed)
+    if freed:
+        bump_version(feed_scope(student.pk))
+    return len(freed)
+
+
+def attendance_state(student, event_ids):
+    """{event_id: ATTENDING | WAITLISTED | NOT_GOING} for the given events."""
+    state = dict.fromkeys(event_ids, NOT_GOING)
+    for pk in WaitlistEntry.objects.filter(
+            student=student, event_id__in=event_ids).values_list("event_id", flat=True):
+        state[pk] = WAITLISTED
+    for pk in Attendance.objects.filter(
+            student=student, event_id__in=event_ids).values_list("event_id", flat=True):
+        state[pk] = ATTENDING
+    return state
+
+
+def recount_attendees(event_ids=None):
+    """Recompute attendee_count from the through table (all events when None)."""
+    counts = Attendance.objects.filter(event=OuterRef("pk")).order_by().values(
+        "event").annotate(n=Count("*")).values("n")
+    events = Event.objects.all() if event_ids is None else Event.objects.filter(pk__in=event_ids)
+    events.update(attendee_count=Coalesce(Subquery(counts), 0))
+
+
+def join_event(student, event_id):
+    status = join_events(student, [event_id]).get(event_id, NOT_GOING)
+    bump_version("events")
+    return status
+
+
+def leave_event(student, event_id):
+    leave_events(student, [event_id])
+    bump_version("events")
@@ -0,0 +1,119 @@
+"""
+Full-text search over events and venues (SQLite FTS5).
+
+link_up_search (created in migration 0017) holds one row per Event and
+Venue: title is the name, body the description/address, place the venue's
+city. Rows are keyed by rowid = pk * 2 (+1 for venues), so keeping a row in
+sync is a delete and an insert on the rowid; the signals in link_up.signals
+do that on every save/delete. bulk_create/update() skip those signals, run
+rebuild_index() (manage.py rebuild_search_index) after bulk loads.
+
+Like the ORM, queries go through the database routers: searches read from
+whichever alias the request reads from (a replica under @read_replica, which
+has the index by copy) and index maintenance writes to the primary.
+"""
+import re
+
+from django.db import connections, router
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Event, Venue
+
+TABLE = "link_up_search"
+KINDS = {"event": 0, "venue": 1}
+# Title matches count most, then description/address, then city
+WEIGHTS = (10.0, 2.0, 4.0)
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _rowid(kind, pk):
+    return pk * 2 + KINDS[kind]
+
+
+def _document(kind, obj):
+    if kind == "event":
+        return obj.name, obj.description or "", ""
+    return obj.name, obj.address, obj.city
+
+
+def _connection_for_write():
+    return connections[router.db_for_write(Event)]
+
+
+def index(kind, obj):
+    rowid = _rowid(kind, obj.pk)
+    with _connection_for_write().cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE} WHERE rowid = %s", [rowid])
+        cursor.execute(
+            f"INSERT INTO {TABLE} (rowid, title, body, place) VALUES (%s, %s, %s, %s)",
+            [rowid, *_document(kind, obj)])
+
+
+def remove(kind, pk):
+    with _connection_for_write().cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE} WHERE rowid = %s", [_rowid(kind, pk)])
+
+
+def rebuild_index():
+    with _connection_for_write().cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE}")
+        cursor.execute(
+            f"INSERT INTO {TABLE} (rowid, title, body, place) "
+            f"SELECT id * 2, name, description, '' FROM {Event._meta.db_table}")
+        cursor.execute(
+            f"INSERT INTO {TABLE} (rowid, title, body, place) "
+            f"SELECT id * 2 + 1, name, address, city FROM {Venue._meta.db_table}")
+        cursor.execute(f"INSERT INTO {TABLE} ({TABLE}) VALUES ('optimize')")
+
+
+def match_expression(query):
+    """
+    Turn free text into an FTS5 query: every word must match as a prefix
+    (so "comp sci f" finds "Computer Science Fair"). Returns "" when there
+    is nothing searchable.
+    """
+    words = _WORD.findall(query.lower())[:8]
+    # Each word quoted so FTS5 operators typed by users are just text
+    return " ".join(f'"{w}"*' for w in words)
+
+
+def search(query, kind=None, limit=10):
+    """[(kind, pk)] best match first, optionally only "event" or "venue" rows."""
+    expression = match_expression(query)
+    if not expression:
+        return []
+    params = [expression]
+    kind_filter = ""
+    if kind is not None:
+        # "%%" is a literal modulo under the DB-API paramstyle
+        kind_filter = "AND rowid %% 2 = %s"
+        params.append(KINDS[kind])
+    with connections[router.db_for_read(Event)].cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s {kind_filter} "
+            f"ORDER BY bm25({TABLE}, %s, %s, %s) LIMIT %s",
+            params + [*WEIGHTS, limit])
+        rows = cursor.fetchall()
+    names = {v: k for k, v in KINDS.items()}
+    return [(names[rowid % 2], rowid // 2) for (rowid,) in rows]
+
+
+def matching_ids(query, kind, limit):
+    """Best-ranked pks of `kind` for query, at most limit of them."""
+    return [pk for _, pk in search(query, kind, limit)]
+
+
+def matching_filter(query, kind):
+    """
+    Q restricting a queryset of `kind` to every row matching query, as a
+    subquery on the index: no cap on the matches, so it composes with
+    ordering and keyset pagination on the outer query.
+    """
+    expression = match_expression(query)
+    if not expression:
+        return Q(pk__in=[])
+    return Q(pk__in=RawSQL(
+        f"SELECT rowid / 2 FROM {TABLE} WHERE {TABLE} MATCH %s AND rowid %% 2 = %s",
+        [expression, KINDS[kind]]))
@@ -0,0 +1,167 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save, post_delete
+from django.dispatch import receiver
+
+from .broadcast import status_changes
+from .cache_versions import bump_version
+from .floor import resource_entry
+from .models import (
+    Computer, StudyRoom, Reservation, Event, EventImageRendition, Venue, Manager,
+    WaitlistEntry,
+)
+from .ics import feed_scope
+from .renditions import schedule_renditions
+from . import search, utilization
+from .rsvp import fill_from_waitlist, recount_attendees
+
+
+@receiver(post_save, sender=Computer)
+@receiver(post_save, sender=StudyRoom)
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Computer)
+@receiver(post_delete, sender=StudyRoom)
+@receiver(post_delete, sender=Reservation)
+def invalidate_floor_snapshot(sender, **kwargs):
+    """Any seat, room or booking write makes the cached floor map stale."""
+    bump_version("floor")
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=Venue)
+@receiver(post_delete, sender=Event)
+@receiver(post_delete, sender=Venue)
+@receiver(m2m_changed, sender=Event.attendees.through)
+def invalidate_event_pages(sender, **kwargs):
+    """Event, venue and RSVP writes change the event and venue listings."""
+    bump_version("events")
+
+
+@receiver(post_save, sender=Venue)
+@receiver(post_delete, sender=Venue)
+def invalidate_venue_choices(sender, **kwargs):
+    """Venue autocomplete only changes with the venues, not with RSVP traffic."""
+    bump_version("venues")
+
+
+@receiver(post_save, sender=Manager)
+@receiver(post_delete, sender=Manager)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_manager_choices(sender, update_fields=None, **kwargs):
+    """Manager autocomplete results show names; logins only touch last_login."""
+    if update_fields is not None and set(update_fields) == {"last_login"}:
+        return
+    bump_version("managers")
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_calendar(sender, **kwargs):
+    """Only the events themselves show on the month calendar, not RSVPs."""
+    bump_version("event_calendar")
+
+
+@receiver(post_save, sender=Venue)
+@receiver(post_delete, sender=Venue)
+def invalidate_event_locations(sender, **kwargs):
+    """Calendar feeds show each event's venue as its LOCATION."""
+    bump_version("event_calendar")
+
+
+@receiver(m2m_changed, sender=Event.attendees.through)
+def sync_attendee_count(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    attendees.add()/remove()/clear() (admin, shell) bypass link_up.rsvp, so
+    recount the affected events. Reverse clears (student.event_set.clear())
+    don't say which events changed and recount everything.
+    """
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    recount_attendees(pk_set if reverse else [instance.pk])
+    # Student pk is the user pk; a forward clear() doesn't say who was removed
+    for student_id in ([instance.pk] if reverse else pk_set or ()):
+        bump_version(feed_scope(student_id))
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=Venue)
+def admit_waitlist_on_capacity_change(sender, instance, created, **kwargs):
+    """A raised (or removed) seat limit lets people off the waitlist."""
+    if created:
+        return
+    waitlist = WaitlistEntry.objects.filter(
+        **({"event": instance} if sender is Event else {"event__venue": instance}))
+    event_ids = list(waitlist.order_by().values_list("event_id", flat=True).distinct())
+    if event_ids:
+        with transaction.atomic():
+            fill_from_waitlist(event_ids)
+
+
+@receiver(post_save, sender=Event)
+def refresh_image_renditions(sender, instance, **kwargs):
+    """New or replaced uploads get renditions built; a removed image drops them."""
+    renditions = EventImageRendition.objects.filter(event=instance)
+    if not instance.image:
+        renditions.delete()
+    elif not renditions.filter(source_name=instance.image.name).exists():
+        schedule_renditions(instance)
+
+
+@receiver(post_delete, sender=EventImageRendition)
+def delete_rendition_file(sender, instance, **kwargs):
+    """Renditions go with a cleared or replaced image and with their event; so do the files."""
+    transaction.on_commit(lambda: instance.image.delete(save=False))
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=Venue)
+def update_search_index(sender, instance, **kwargs):
+    search.index("event" if sender is Event else "venue", instance)
+
+
+@receiver(post_delete, sender=Event)
+@receiver(post_delete, sender=Venue)
+def remove_from_search_index(sender, instance, **kwargs):
+    search.remove("event" if sender is Event else "venue", instance.pk)
+
+
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Reservation)
+def invalidate_calendar_feed(sender, instance, **kwargs):
+    bump_version(feed_scope(instance.user_id))
+
+
+def _publish_status(resource_type, resource_id):
+    # Skip the lookups entirely when nobody is listening
+    if not status_changes.has_subscribers():
+        return
+    entry = resource_entry(resource_type, resource_id)
+    if entry is not None:
+        status_changes.publish(dict(entry, type=resource_type))
+
+
+@receiver(post_save, sender=Computer)
+@receiver(post_save, sender=StudyRoom)
+def publish_resource_status(sender, instance, **kwargs):
+    resource_type = "computer" if sender is Computer else "room"
+    transaction.on_commit(lambda: _publish_status(resource_type, instance.pk))
+
+
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Reservation)
+def publish_reservation_status(sender, instance, **kwargs):
+    transaction.on_commit(
+        lambda: _publish_status(instance.resource_type, instance.resource_id))
+
+
+@receiver(post_save, sender=Reservation)
+def add_utilization(sender, instance, created, **kwargs):
+    if created:
+        utilization.add_reservation(instance)
+
+
+@receiver(post_delete, sender=Reservation)
+def release_utilization(sender, instance, **kwargs):
+    # Only the unused remainder goes back; deleting an ended booking is a no-op
+    utilization.remove_reservation(instance)
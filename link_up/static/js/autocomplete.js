@@ -0,0 +1,47 @@
+// Type-to-search for <select data-autocomplete-url> (see forms.AutocompleteSelect).
+// The server renders only the current pick; matches are fetched as you type.
+(function () {
+  function attach(select) {
+    const url = select.dataset.autocompleteUrl;
+    const search = document.createElement("input");
+    search.type = "search";
+    search.className = "form-control form-control-sm mb-2";
+    search.placeholder = "Type to search...";
+    search.autocomplete = "off";
+    select.before(search);
+
+    let timer = null;
+    let controller = null;
+
+    async function load(q) {
+      if (controller) controller.abort();
+      controller = new AbortController();
+      let data;
+      try {
+        const resp = await fetch(`${url}?q=${encodeURIComponent(q)}`, { signal: controller.signal });
+        if (!resp.ok) return;
+        data = await resp.json();
+      } catch (e) {
+        return; // superseded by a newer keystroke
+      }
+      const current = select.value;
+      // Keep the empty choice and the current pick, replace everything else
+      Array.from(select.options).forEach(opt => {
+        if (opt.value !== "" && opt.value !== current) opt.remove();
+      });
+      data.results.forEach(r => {
+        if (String(r.id) === current) return;
+        select.add(new Option(r.text, r.id));
+      });
+    }
+
+    search.addEventListener("input", () => {
+      clearTimeout(timer);
+      timer = setTimeout(() => load(search.value.trim()), 200);
+    });
+    // Start with the top matches so the list isn't empty before typing
+    load("");
+  }
+
+  document.querySelectorAll("select[data-autocomplete-url]").forEach(attach);
+})();
@@ -1,3 +1,636 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+import threading
+import warnings
+from contextlib import ExitStack
+from datetime import date, datetime, time, timedelta
+from functools import partial
+from io import BytesIO
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.contrib import messages
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache.backends.base import CacheKeyWarning
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connections
+from django.http import HttpResponse
+from django.test import (
+    Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+
+from .availability import AvailabilityIndex, DayAvailability
+from .expiry import _cleanup_status_for_resource, expire_reservations
+from . import ics, rsvp, search, utilization
+from .middleware import ReplicaRoutingMiddleware
+from .routers import ReadReplicaRouter
+from .views import _event_page
+from .models import (
+    Computer, StudyRoom, Reservation, ReservationArchive, Event, Venue, Student, WaitlistEntry,
+    UtilizationBucket,
+)
+
+
+def post_concurrently(calls):
+    """
+    Run every request callable on its own thread, all released at once by a
+    barrier; return the response status codes.
+    """
+    barrier = threading.Barrier(len(calls))
+    statuses = []
+    lock = threading.Lock()
+
+    def run(call):
+        try:
+            barrier.wait()
+            resp = call()
+            with lock:
+                statuses.append(resp.status_code)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=run, args=(call,)) for call in calls]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return statuses
+
+
+class DayAvailabilityTests(SimpleTestCase):
+    day = date(2026, 3, 2)
+
+    def at(self, hour, minute=0, second=0, days=0):
+        tz = timezone.get_current_timezone()
+        return timezone.make_aware(
+            datetime.combine(self.day + timedelta(days=days), time(hour, minute, second)), tz)
+
+    def test_starts_round_down_and_ends_round_up(self):
+        avail = DayAvailability(self.day)
+        avail.add(self.at(10, 10), self.at(10, 50))
+        # 9:30 free, 10:00 and 10:30 booked, 11:00 free
+        self.assertEqual(avail.bitstring(19, 23), "1001")
+        self.assertEqual(avail.cell_range(self.at(10, 10), self.at(10, 50)), (20, 22))
+
+    def test_bookings_crossing_day_edges_are_clipped(self):
+        avail = DayAvailability(self.day)
+        avail.add(self.at(23, days=-1), self.at(1))
+        avail.add(self.at(23, 30), self.at(1, days=1))
+        self.assertEqual(avail.bitstring(0, 3), "001")
+        self.assertEqual(avail.bitstring(46, 48), "10")
+        self.assertTrue(avail.is_free(self.at(1), self.at(23, 30)))
+
+    def test_adjacent_bookings_do_not_overlap(self):
+        avail = DayAvailability(self.day)
+        avail.add(self.at(10), self.at(11))
+        self.assertTrue(avail.is_free(self.at(11), self.at(12)))
+        self.assertTrue(avail.is_free(self.at(9), self.at(10)))
+        self.assertFalse(avail.is_free(self.at(10, 30), self.at(11, 30)))
+        avail.add(self.at(11), self.at(12))
+        self.assertEqual(avail.bitstring(20, 24), "0000")
+
+    def test_is_free_on_an_exact_boundary(self):
+        avail = DayAvailability(self.day)
+        avail.add(self.at(10), self.at(11))
+        self.assertFalse(avail.is_free_at(self.at(10, 59, 59)))
+        self.assertTrue(avail.is_free_at(self.at(11)))
+        self.assertTrue(avail.is_free_at(self.at(9, 59, 59)))
+        self.assertFalse(avail.is_free_at(self.at(10)))
+
+    def test_holder_at(self):
+        index = AvailabilityIndex(self.day, [
+            SimpleNamespace(resource_type="computer", resource_id=1, user_id=7,
+                            start=self.at(10), end=self.at(11)),
+            SimpleNamespace(resource_type="computer", resource_id=1, user_id=8,
+                            start=self.at(11), end=self.at(12)),
+        ])
+        self.assertEqual(index.holder_at("computer", 1, self.at(10, 30)), 7)
+        self.assertEqual(index.holder_at("computer", 1, self.at(11)), 8)
+        self.assertIsNone(index.holder_at("computer", 1, self.at(12)))
+        self.assertIsNone(index.holder_at("computer", 1, self.at(10, days=1)))
+        self.assertIsNone(index.holder_at("room", 1, self.at(10, 30)))
+        self.assertEqual(index.get("room", 1).bitstring(0, 48), "1" * 48)
+
+
+class StaleStatusCleanupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("vaquero01", password="pw")
+        self.now = timezone.now()
+
+    def _seed_lab(self, size):
+        Computer.objects.all().delete()
+        Computer.objects.bulk_create([
+            Computer(name=f"PC-{i:04d}", status="reserved", reserved_by=self.user)
+            for i in range(size)
+        ])
+        # Keep the first seat genuinely booked right now
+        first = Computer.objects.order_by("name").first()
+        Reservation.objects.create(
+            resource_type="computer", computer=first, user=self.user,
+            start=self.now - timedelta(minutes=10),
+            end=self.now + timedelta(minutes=50),
+        )
+        return first
+
+    def test_query_count_is_constant_as_lab_grows(self):
+        for size in (40, 2000):
+            with self.subTest(size=size):
+                booked = self._seed_lab(size)
+                with self.assertNumQueries(1):
+                    released = _cleanup_status_for_resource(Computer, "computer", self.now)
+                self.assertEqual(released, size - 1)
+                booked.refresh_from_db()
+                self.assertEqual(booked.status, "reserved")
+                self.assertEqual(
+                    Computer.objects.filter(status="available", reserved_by=None).count(),
+                    size - 1)
+
+    def test_rooms_without_live_reservation_are_released(self):
+        room = StudyRoom.objects.create(name="SR-1", status="occupied", reserved_by=self.user)
+        Reservation.objects.create(
+            resource_type="room", room=room, user=self.user,
+            start=self.now - timedelta(hours=2),
+            end=self.now - timedelta(hours=1),
+        )
+        with self.assertNumQueries(1):
+            _cleanup_status_for_resource(StudyRoom, "room", self.now)
+        room.refresh_from_db()
+        self.assertEqual(room.status, "available")
+        self.assertIsNone(room.reserved_by)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("vaquero01", password="pw")
+        self.client.force_login(self.user)
+
+    def _tag(self, url):
+        # The first visit hands out the CSRF cookie, which is part of the tag
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response["ETag"]
+
+    def _revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_floor_page_changes_with_a_booking(self):
+        pc = Computer.objects.create(name="PC-01")
+        etag = self._tag("/available_computers/")
+        self.assertEqual(self._revalidate("/available_computers/", etag).status_code, 304)
+
+        now = timezone.now()
+        Reservation.objects.create(resource_type="computer", computer=pc, user=self.user,
+                                   start=now, end=now + timedelta(hours=1))
+        response = self._revalidate("/available_computers/", etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_events_page_changes_with_an_event_edit(self):
+        event = Event.objects.create(name="Career Fair",
+                                     event_date=timezone.now() + timedelta(days=3))
+        etag = self._tag("/all-events-student/")
+        self.assertEqual(self._revalidate("/all-events-student/", etag).status_code, 304)
+
+        event.name = "Spring Career Fair"
+        event.save()
+        response = self._revalidate("/all-events-student/", etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertContains(response, "Spring Career Fair")
+
+    def test_pending_flash_message_is_never_a_304(self):
+        etag = self._tag("/all-events-student/")
+        storage = CookieStorage(RequestFactory().get("/"))
+        storage.add(messages.INFO, "You're on the waitlist.")
+        flashed = HttpResponse()
+        storage.update(flashed)
+        self.client.cookies.update(flashed.cookies)
+
+        response = self._revalidate("/all-events-student/", etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "on the waitlist")
+        # Shown once; after that nothing on the page has changed
+        self.assertEqual(self._revalidate("/all-events-student/", etag).status_code, 304)
+
+
+class EventImageRenditionTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.renditions_dir = os.path.join(media.name, "events-list", "renditions")
+        overrides = override_settings(MEDIA_ROOT=media.name, LINK_UP_RENDITIONS_SYNC=True)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def _upload(self, name, width, height):
+        buffer = BytesIO()
+        Image.new("RGB", (width, height), "orange").save(buffer, "PNG")
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+    def _files(self):
+        return sorted(os.listdir(self.renditions_dir)) if os.path.isdir(self.renditions_dir) else []
+
+    def _sizes(self, event):
+        return sorted(event.renditions.values_list("format", "width", "height"))
+
+    def test_renditions_are_built_replaced_and_removed_with_their_files(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            event = Event.objects.create(name="Career Fair", event_date=timezone.now(),
+                                         image=self._upload("fair.png", 1200, 600))
+        self.assertEqual(self._sizes(event), [
+            ("jpeg", 320, 160), ("jpeg", 640, 320), ("jpeg", 1024, 512),
+            ("webp", 320, 160), ("webp", 640, 320), ("webp", 1024, 512),
+        ])
+        self.assertEqual(len(self._files()), 6)
+
+        # A smaller replacement rebuilds the set and drops the old files
+        event.image = self._upload("fair-v2.png", 500, 400)
+        with self.captureOnCommitCallbacks(execute=True):
+            event.save()
+        self.assertEqual(self._sizes(event), [("jpeg", 320, 256), ("webp", 320, 256)])
+        self.assertEqual(set(event.renditions.values_list("source_name", flat=True)),
+                         {event.image.name})
+        self.assertEqual(self._files(), sorted(
+            os.path.basename(name) for name in event.renditions.values_list("image", flat=True)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            event.delete()
+        self.assertEqual(self._files(), [])
+
+
+class CalendarFeedTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("vaquero01", password="pw")
+        self.venue = Venue.objects.create(name="Student Union", city="Edinburg")
+        self.event = Event.objects.create(
+            name="Orientation Mixer", venue=self.venue,
+            event_date=timezone.now() + timedelta(days=2))
+        self.event.attendees.add(self.user.student)
+        self.url = f"/calendar/{ics.make_token(self.user)}.ics"
+
+    def _feed(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content if response.streaming
+                        else [response.content]).decode()
+
+    def test_venue_rename_shows_in_the_cached_feed(self):
+        self.assertIn("LOCATION:Student Union\\, Edinburg", self._feed())
+        self.assertIn("LOCATION:Student Union\\, Edinburg", self._feed())  # cached
+
+        self.venue.name = "Ballroom"
+        self.venue.save()
+        feed = self._feed()
+        self.assertIn("LOCATION:Ballroom\\, Edinburg", feed)
+        self.assertNotIn("Student Union", feed)
+
+
+class ReservationArchiveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("vaquero01", password="pw")
+        self.now = timezone.now()
+        self.pc = Computer.objects.create(name="PC-1")
+
+    def test_expiry_moves_finished_rows_in_batches(self):
+        Reservation.objects.bulk_create([
+            Reservation(resource_type="computer", computer=self.pc, user=self.user,
+                        start=self.now - timedelta(days=1, hours=i + 1),
+                        end=self.now - timedelta(days=1, hours=i))
+            for i in range(25)
+        ])
+        live = Reservation.objects.create(
+            resource_type="computer", computer=self.pc, user=self.user,
+            start=self.now - timedelta(minutes=10), end=self.now + timedelta(minutes=50))
+
+        self.assertEqual(expire_reservations(self.now, batch_size=10), 25)
+        self.assertEqual(list(Reservation.objects.values_list("id", flat=True)), [live.id])
+        self.assertEqual(ReservationArchive.objects.count(), 25)
+        self.assertFalse(ReservationArchive.objects.filter(reservation_id=live.id).exists())
+
+    def test_archiving_skips_per_row_signals(self):
+        Reservation.objects.bulk_create([
+            Reservation(resource_type="computer", computer=self.pc, user=self.user,
+                        start=self.now - timedelta(hours=i + 2),
+                        end=self.now - timedelta(hours=i + 1))
+            for i in range(20)
+        ])
+        with mock.patch("link_up.signals.bump_version") as per_row, \
+                mock.patch("link_up.expiry.bump_version") as per_run:
+            self.assertEqual(expire_reservations(self.now, batch_size=8), 20)
+        per_row.assert_not_called()
+        per_run.assert_called_once_with("floor")
+
+    def test_export_includes_archived_history(self):
+        Reservation.objects.create(
+            resource_type="computer", computer=self.pc, user=self.user,
+            start=self.now - timedelta(hours=2), end=self.now - timedelta(hours=1))
+        expire_reservations(self.now)
+        Reservation.objects.create(
+            resource_type="computer", computer=self.pc, user=self.user,
+            start=self.now + timedelta(hours=1), end=self.now + timedelta(hours=2))
+
+        staff = User.objects.create_user("staff", password="pw", is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get("/export/reservations.csv")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[1].endswith(",yes"))
+        self.assertTrue(lines[2].endswith(",no"))
+
+
+class UtilizationRollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("vaquero01", password="pw")
+        self.room = StudyRoom.objects.create(name="SR-1")
+        self.now = timezone.now().replace(microsecond=0)
+
+    def _booked(self):
+        return sum(UtilizationBucket.objects.values_list("booked_minutes", flat=True))
+
+    def _book(self, start, end):
+        return Reservation.objects.create(
+            resource_type="room", room=self.room, user=self.user, start=start, end=end)
+
+    def test_create_cancel_and_expire(self):
+        self._book(self.now - timedelta(hours=2), self.now - timedelta(minutes=30))
+        self._book(self.now + timedelta(hours=1), self.now + timedelta(hours=2))
+        self.assertEqual(self._booked(), 90 + 60)
+
+        # Archiving an ended booking keeps its minutes
+        expire_reservations(self.now)
+        self.assertEqual(self._booked(), 150)
+
+        # Cancelling gives back only what hasn't happened yet
+        running = self._book(self.now - timedelta(minutes=20), self.now + timedelta(minutes=40))
+        with mock.patch("django.utils.timezone.now", return_value=self.now):
+            running.delete()
+        self.assertEqual(self._booked(), 150 + 20)
+
+        self.assertEqual(sum(m for *_, m in utilization.heatmap_rows(
+            self.now - timedelta(days=1), self.now + timedelta(days=1))), 170)
+
+    def test_heatmap_is_one_rollup_query(self):
+        for day in range(14):
+            start = self.now - timedelta(days=day + 1)
+            self._book(start, start + timedelta(hours=1))
+        staff = User.objects.create_user("staff", password="pw", is_staff=True)
+        self.client.force_login(staff)
+        # session + user, the rollup GROUP BY, then the computer and room names
+        with self.assertNumQueries(5):
+            response = self.client.get("/api/utilization/")
+        rooms = response.json()["resources"]["room"]["resources"]
+        self.assertGreater(sum(map(sum, rooms[str(self.room.id)]["heatmap"])), 0)
+
+
+class ResourceTypeValidationTests(TestCase):
+    def test_unknown_type_is_rejected(self):
+        User.objects.create_user("vaquero01", password="pw")
+        self.client.login(username="vaquero01", password="pw")
+        for url, extra in (("/api/status/", {"status": "reserved"}),
+                           ("/api/slots/", {}),
+                           ("/api/reserve/", {"reserve_now": True})):
+            with self.subTest(url=url):
+                response = self.client.post(
+                    url, json.dumps({"type": "printer", "id": 1, **extra}),
+                    content_type="application/json")
+                self.assertEqual(response.status_code, 400)
+
+
+class EventFormAutocompleteTests(TestCase):
+    def test_bad_venue_re_renders_with_errors(self):
+        self.client.force_login(User.objects.create_user("vaquero01", password="pw"))
+        response = self.client.post("/add-events/", {"name": "Hackathon", "venue": "abc"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("venue", response.context["form"].errors)
+
+    def test_multi_word_query_uses_a_memcached_safe_key(self):
+        Venue.objects.create(name="Student Union Ballroom", city="Edinburg")
+        self.client.force_login(User.objects.create_user("vaquero01", password="pw"))
+        for _ in range(2):  # miss, then hit
+            with warnings.catch_warnings():
+                warnings.simplefilter("error", CacheKeyWarning)
+                response = self.client.get("/api/autocomplete/venues/",
+                                           {"q": "Student  Union ballroom"})
+            self.assertEqual([r["text"] for r in response.json()["results"]],
+                             ["Student Union Ballroom (Edinburg)"])
+
+
+@override_settings(LINK_UP_READ_REPLICAS=["replica1", "replica2"])
+class ReplicaRoutingTests(TransactionTestCase):
+    """Two replica aliases mirroring the test database's file."""
+    REPLICAS = ["replica1", "replica2"]
+    # Resolved in setUpClass, after the replica aliases below are added
+    databases = "__all__"
+
+    @classmethod
+    def setUpClass(cls):
+        for alias in cls.REPLICAS:
+            connections.settings[alias] = dict(connections["default"].settings_dict)
+        cls.addClassCleanup(cls._drop_replicas)
+        super().setUpClass()
+
+    @classmethod
+    def _drop_replicas(cls):
+        for alias in cls.REPLICAS:
+            connections[alias].close()
+            del connections[alias]
+            del connections.settings[alias]
+
+    def setUp(self):
+        self.user = User.objects.create_user("vaquero01", password="pw")
+        self.computer = Computer.objects.create(name="PC-01")
+        tz = timezone.get_current_timezone()
+        now = timezone.make_aware(
+            datetime.combine(timezone.localdate(), datetime.min.time()), tz
+        ) + timedelta(hours=10, minutes=10)
+        patcher = mock.patch("django.utils.timezone.now", return_value=now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Fresh client so the middleware chain is built with replicas configured
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def _queries_per_alias(self, method, url, **kwargs):
+        captures = {alias: CaptureQueriesContext(connections[alias])
+                    for alias in ("default", *self.REPLICAS)}
+        with ExitStack() as stack:
+            for capture in captures.values():
+                stack.enter_context(capture)
+            response = getattr(self.client, method)(url, **kwargs)
+        return response, {alias: len(c) for alias, c in captures.items()}
+
+    def test_read_only_view_uses_a_single_replica(self):
+        for _ in range(5):
+            response, counts = self._queries_per_alias("get", "/available_computers/")
+            self.assertEqual(response.status_code, 200)
+            used = [alias for alias in self.REPLICAS if counts[alias]]
+            self.assertEqual(len(used), 1, counts)
+
+    def test_search_reads_the_request_replica(self):
+        Venue.objects.create(name="Student Union", city="Edinburg")
+        response, counts = self._queries_per_alias("get", "/api/search/", data={"q": "union"})
+        self.assertEqual([r["title"] for r in response.json()["results"]], ["Student Union"])
+        used = [alias for alias in self.REPLICAS if counts[alias]]
+        self.assertEqual(len(used), 1, counts)
+        self.assertEqual(counts["default"], 0, counts)
+
+    def test_request_after_a_write_reads_the_primary(self):
+        response = self.client.post(
+            "/api/reserve/", json.dumps({"type": "computer", "id": self.computer.id,
+                                         "reserve_now": True}),
+            content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(ReplicaRoutingMiddleware.COOKIE, response.cookies)
+
+        response, counts = self._queries_per_alias("get", "/available_computers/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([counts[alias] for alias in self.REPLICAS], [0, 0])
+        self.assertGreater(counts["default"], 0)
+
+    def test_writes_outside_read_views_stay_on_primary(self):
+        router = ReadReplicaRouter()
+        self.assertEqual(router.db_for_read(Computer), "default")
+        self.assertEqual(router.db_for_write(Computer), "default")
+        self.assertFalse(router.allow_migrate("replica1", "link_up"))
+
+
+class EventSearchPaginationTests(TestCase):
+    def test_search_pages_past_the_ranked_result_cap(self):
+        start = timezone.now() + timedelta(days=1)
+        Event.objects.bulk_create([
+            Event(name=f"Career Fair {i}", event_date=start + timedelta(minutes=i))
+            for i in range(600)
+        ] + [Event(name="Chess Club", event_date=start)])
+        search.rebuild_index()
+
+        seen = []
+        query = "q=fair"
+        while query:
+            request = RequestFactory().get(f"/events/?{query}")
+            request.user = AnonymousUser()
+            page = _event_page(request, Event.objects.all())
+            seen += [e.name for e in page["event_list"]]
+            query = page["next_page_query"]
+        self.assertEqual(len(seen), 600)
+        self.assertNotIn("Chess Club", seen)
+
+
+class ConcurrentReservationTests(TransactionTestCase):
+    THREADS = 200
+
+    def setUp(self):
+        self.computer = Computer.objects.create(name="PC-01")
+        # Pin the clock mid-morning so today's slots are always bookable
+        tz = timezone.get_current_timezone()
+        self.now = timezone.make_aware(
+            datetime.combine(timezone.localdate(), datetime.min.time()), tz
+        ) + timedelta(hours=10, minutes=10)
+        patcher = mock.patch("django.utils.timezone.now", return_value=self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _client_for(self, user):
+        client = Client()
+        client.force_login(user)
+        return client
+
+    def _burst(self, requests):
+        """Fire every (client, payload) at api/reserve/ at once; return status codes."""
+        return post_concurrently([
+            partial(client.post, "/api/reserve/", json.dumps(payload),
+                    content_type="application/json")
+            for client, payload in requests
+        ])
+
+    def test_many_students_one_seat_exactly_one_wins(self):
+        users = User.objects.bulk_create(
+            [User(username=f"student{i:03d}") for i in range(self.THREADS)])
+        # Half ask for 10:00-11:00 ("now"), half for the overlapping 10:30-11:30
+        half_past = (self.now + timedelta(minutes=20)).isoformat()
+        requests = [
+            (self._client_for(user),
+             {"type": "computer", "id": self.computer.id, "reserve_now": True}
+             if i % 2 else
+             {"type": "computer", "id": self.computer.id, "start": half_past})
+            for i, user in enumerate(users)
+        ]
+        statuses = self._burst(requests)
+        self.assertEqual(statuses.count(200), 1)
+        self.assertEqual(statuses.count(400), self.THREADS - 1)
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_one_student_many_seats_gets_one_booking(self):
+        user = User.objects.create(username="vaquero01")
+        seats = Computer.objects.bulk_create(
+            [Computer(name=f"PC-{i:03d}") for i in range(2, 52)])
+        statuses = self._burst([
+            (self._client_for(user), {"type": "computer", "id": seat.id, "reserve_now": True})
+            for seat in seats
+        ])
+        self.assertEqual(statuses.count(200), 1)
+        self.assertEqual(Reservation.objects.filter(user=user).count(), 1)
+
+
+class EventCapacityTests(TransactionTestCase):
+    STUDENTS = 120
+    CAPACITY = 25
+
+    def setUp(self):
+        venue = Venue.objects.create(name="Student Union", capacity=self.CAPACITY)
+        self.event = Event.objects.create(
+            name="Orientation Mixer", venue=venue,
+            event_date=timezone.now() + timedelta(days=2))
+        users = User.objects.bulk_create(
+            [User(username=f"student{i:03d}") for i in range(self.STUDENTS)])
+        # bulk_create skips the profile signal
+        self.students = [Student.objects.create(user=user) for user in users]
+
+    def _rsvp_burst(self, users, payload):
+        calls = []
+        for user in users:
+            client = Client()
+            client.force_login(user)
+            calls.append(partial(client.post, "/api/events/rsvp/", json.dumps(payload),
+                                 content_type="application/json"))
+        return post_concurrently(calls)
+
+    def _assert_consistent(self):
+        self.event.refresh_from_db()
+        seated = self.event.attendees.count()
+        self.assertEqual(self.event.attendee_count, seated)
+        self.assertLessEqual(seated, self.CAPACITY)
+        return seated
+
+    def test_capacity_is_never_exceeded_under_a_burst(self):
+        statuses = self._rsvp_burst([s.user for s in self.students],
+                                    {"attend": [self.event.pk]})
+        self.assertEqual(statuses.count(200), self.STUDENTS)
+        self.assertEqual(self._assert_consistent(), self.CAPACITY)
+        self.assertEqual(WaitlistEntry.objects.filter(event=self.event).count(),
+                         self.STUDENTS - self.CAPACITY)
+
+    def test_leaving_admits_the_waitlist_in_order(self):
+        self._rsvp_burst([s.user for s in self.students], {"attend": [self.event.pk]})
+        seated = list(self.event.attendees.all()[:10])
+        first_waiting = [e.student_id for e in WaitlistEntry.objects.filter(event=self.event)[:10]]
+
+        self._rsvp_burst([s.user for s in seated], {"leave": [self.event.pk]})
+        self.assertEqual(self._assert_consistent(), self.CAPACITY)
+        now_seated = set(self.event.attendees.values_list("pk", flat=True))
+        self.assertTrue(set(first_waiting) <= now_seated)
+        self.assertFalse(now_seated & {s.pk for s in seated})
+
+    def test_leaving_with_a_drifted_counter_stops_at_zero(self):
+        student = self.students[0]
+        self.event.attendees.add(student)
+        Event.objects.filter(pk=self.event.pk).update(attendee_count=0)
+
+        self.assertEqual(rsvp.leave_events(student, [self.event.pk]), 1)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attendee_count, 0)
@@ -10,11 +10,14 @@ urlpatterns = [
     path("about/", views.about, name="about"),
     path("available_computers/", views.available_computers,
          name="available_computers"),
+    path("api/metrics/", views.request_metrics_report, name="request_metrics"),
+    path("api/status/stream/", views.status_stream, name="status_stream"),
     path("media-equipment/", views.media_equipment, name="media_equipment"),
     path("events/", views.events, name="events"),
     path("api/status/", views.update_status, name="update_status"),
     path("api/position/", views.update_position, name="update_position"),
     path("api/slots/", views.available_slots, name="available_slots"),
+    path("api/slots/grid/", views.availability_grid, name="availability_grid"),
     path("api/reserve/", views.create_reservation, name="create_reservation"),
     path("api/cancel-reservation/", views.cancel_reservation, name="cancel_reservation"),
     path("add-venue/", views.add_venue, name="add-venue"),
@@ -27,6 +30,15 @@ urlpatterns = [
     path('delete_venue/<venue_id>', views.delete_venue, name="delete-venue"),
     path('attend/<int:event_id>/', views.attend_event, name='attend-event'),
     path('not-attend/<int:event_id>', views.not_attend, name="not-attend"),
+    path("api/search/", views.search_typeahead, name="search"),
+    path("api/autocomplete/venues/", views.autocomplete_venues, name="autocomplete-venues"),
+    path("api/autocomplete/managers/", views.autocomplete_managers, name="autocomplete-managers"),
+    path("api/events/rsvp/", views.bulk_rsvp, name="bulk_rsvp"),
+    path("export/events/<int:event_id>/attendees.csv", views.export_event_attendees,
+         name="export-event-attendees"),
+    path("export/reservations.csv", views.export_reservations, name="export-reservations"),
+    path("api/utilization/", views.utilization_heatmap, name="utilization"),
+    path("calendar/<str:token>.ics", views.calendar_feed, name="calendar-feed"),
     path('my-events/', views.my_events, name='my-events'),
     path('all-events-student/', views.all_events_student,
          name='all-events-student'),
@@ -0,0 +1,113 @@
+"""
+Hourly utilization rollups for computers and study rooms.
+
+Each UtilizationBucket holds the minutes a resource was booked during one
+local clock hour. Buckets are maintained incrementally from the Reservation
+signals (see link_up.signals):
+
+* a new booking adds its minutes to every hour it touches;
+* a booking removed before it ends (cancelled, or cleared by staff) gives
+  back the part that hadn't happened yet;
+* a booking removed after it ended keeps all of its minutes. The expiry
+  job archives with a raw DELETE that skips the signals altogether, so
+  archiving leaves the rollups untouched.
+
+Loads that skip signals (bulk_create) can be folded in with
+`manage.py rebuild_utilization`.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import Reservation, ReservationArchive, UtilizationBucket
+
+HOUR = timedelta(hours=1)
+
+
+def hour_spans(start, end):
+    """Yield (local hour start, minutes booked in that hour) for [start, end)."""
+    start = timezone.localtime(start)
+    end = timezone.localtime(end)
+    hour = start.replace(minute=0, second=0, microsecond=0)
+    while hour < end:
+        following = timezone.localtime(hour + HOUR)
+        minutes = round((min(end, following) - max(start, hour)).total_seconds() / 60)
+        if minutes > 0:
+            yield hour, minutes
+        hour = following
+
+
+def _bucket_fields(hour):
+    return {"weekday": hour.weekday(), "hour_of_day": hour.hour}
+
+
+def _apply(resource_type, resource_id, start, end, sign):
+    with transaction.atomic():
+        for hour, minutes in hour_spans(start, end):
+            buckets = UtilizationBucket.objects.filter(
+                resource_type=resource_type, resource_id=resource_id, hour=hour)
+            if sign > 0:
+                if buckets.update(booked_minutes=F("booked_minutes") + minutes):
+                    continue
+                try:
+                    # Savepoint so losing the race doesn't poison the outer transaction
+                    with transaction.atomic():
+                        UtilizationBucket.objects.create(
+                            resource_type=resource_type, resource_id=resource_id, hour=hour,
+                            booked_minutes=minutes, **_bucket_fields(hour))
+                except IntegrityError:
+                    buckets.update(booked_minutes=F("booked_minutes") + minutes)
+            else:
+                # Clamp at zero: the booking may predate the rollups
+                buckets.update(booked_minutes=Greatest(F("booked_minutes") - minutes, Value(0)))
+
+
+def add_reservation(res):
+    _apply(res.resource_type, res.resource_id, res.start, res.end, +1)
+
+
+def remove_reservation(res, now=None):
+    """Give back the minutes of res that are still ahead of now."""
+    now = now or timezone.now()
+    start = max(res.start, now)
+    if start < res.end:
+        _apply(res.resource_type, res.resource_id, start, res.end, -1)
+
+
+def rebuild():
+    """Recompute every bucket from the archive and the live table."""
+    totals = defaultdict(int)
+    sources = (
+        ReservationArchive.objects.values_list("resource_type", "resource_id", "start", "end"),
+        Reservation.objects.values_list(
+            "resource_type", Coalesce("computer_id", "room_id"), "start", "end"),
+    )
+    for rows in sources:
+        for resource_type, resource_id, start, end in rows.iterator(chunk_size=2000):
+            for hour, minutes in hour_spans(start, end):
+                totals[resource_type, resource_id, hour] += minutes
+    with transaction.atomic():
+        UtilizationBucket.objects.all().delete()
+        UtilizationBucket.objects.bulk_create([
+            UtilizationBucket(resource_type=resource_type, resource_id=resource_id, hour=hour,
+                              booked_minutes=minutes, **_bucket_fields(hour))
+            for (resource_type, resource_id, hour), minutes in totals.items()
+        ], batch_size=2000)
+    return len(totals)
+
+
+def heatmap_rows(start, end, resource_type=None):
+    """
+    [(resource_type, resource_id, weekday, hour_of_day, minutes)] summed over
+    buckets in [start, end): a single GROUP BY over the rollup table.
+    """
+    buckets = UtilizationBucket.objects.filter(hour__gte=start, hour__lt=end)
+    if resource_type:
+        buckets = buckets.filter(resource_type=resource_type)
+    return list(buckets.order_by().values_list(
+        "resource_type", "resource_id", "weekday", "hour_of_day",
+    ).annotate(minutes=Sum("booked_minutes")))
@@ -1,17 +1,26 @@
 from django.shortcuts import get_object_or_404, render, redirect
 from django.contrib import messages
-from django.forms.models import model_to_dict
-from django.http import JsonResponse, HttpResponseBadRequest
-from django.views.decorators.http import require_POST
+from django.http import JsonResponse, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET, require_POST
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.utils import timezone
-from django.utils.dateparse import parse_datetime
+from django.utils.dateparse import parse_date, parse_datetime
+import asyncio
 import calendar
-from calendar import HTMLCalendar
-from datetime import datetime, time, timedelta
+import hashlib
+from datetime import datetime, time, timedelta, timezone as dt_timezone
 import json
 
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.conf import settings
+
 from .models import (
     Computer,
     StudyRoom,
@@ -21,9 +30,27 @@ from .models import (
     Venue,
     Reservation,
 )
-from .forms import VenueForm, EventForm
+from .forms import VenueForm, EventForm, manager_label
+from .broadcast import status_changes
+from .cache_versions import bump_version, get_version
+from . import exports, ics, rsvp, search, utilization
+from .etags import events_etag, floor_etag, venues_etag
+from .middleware import request_metrics
+from .routers import iterate_with_intent, primary, read_replica
+from .event_calendar import render_month
+from .floor import get_snapshot, overlay_for_user, resource_view, viewer_statuses
+from .availability import (
+    SLOT_MINUTES,
+    AvailabilityIndex,
+    DayAvailability,
+    day_bounds,
+    picker_bounds,
+    reservations_for_day,
+)
 from django.http import HttpResponseRedirect
 from django.urls import reverse
+from django.http import Http404
+from django.utils.http import http_date, urlencode
 
 
 @login_required
@@ -71,6 +98,8 @@ def update_status(request):
     except ValueError:
         return HttpResponseBadRequest("ID must be an integer")
 
+    if item_type not in Reservation.RESOURCE_FIELDS:
+        return HttpResponseBadRequest("type must be 'computer' or 'room'")
     Model = (Computer if item_type == "computer" else StudyRoom)
     obj = Model.objects.filter(pk=pk).first()
     if not obj:
@@ -84,8 +113,7 @@ def update_status(request):
             obj.reserved_by = request.user  # Admin reserves for themself
         else:
             obj.reserved_by = None  # Any other status clears reservation
-            Reservation.objects.filter(resource_type=item_type,
-                                       resource_id=pk).delete()
+            Reservation.objects.filter(**Reservation.resource_lookup(item_type, pk)).delete()
         obj.save()
         return JsonResponse({"ok": True})
 
@@ -108,6 +136,18 @@ def update_status(request):
     return HttpResponseBadRequest("Action not allowed")
 
 
+@staff_member_required
+def request_metrics_report(request):
+    """Aggregated per-URL timings and query counts from RequestMetricsMiddleware."""
+    if request.method == "POST" and request.GET.get("reset"):
+        request_metrics.reset()
+    return JsonResponse({
+        "enabled": getattr(settings, "LINK_UP_REQUEST_METRICS", False),
+        "n_plus_one_threshold": getattr(settings, "LINK_UP_N_PLUS_ONE_THRESHOLD", 5),
+        "routes": request_metrics.snapshot(),
+    })
+
+
 def home(request):
     return render(request, 'home.html', {})
 
@@ -116,82 +156,17 @@ def about(request):
     return render(request, 'about.html', {})
 
 
+@read_replica
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=floor_etag)
 def available_computers(request):
-    # Clean up expired reservations and release stale statuses
-    cleanup_expired_reservations()
-    now = timezone.localtime()
-
-    icon_map = {
-        "computer": {
-            "available": "img/available.png",
-            "reserved":  "img/reserved.png",
-            "occupied":  "img/lock.png",
-            "repair":    "img/bsod.png",
-        },
-        "room": {
-            "available":    "img/sravailable.png",
-            "reserved":     "img/srreserved.png",
-            "occupied":     "img/sroccupied.png",
-            "out_of_order": "img/sroutoforder.png",
-        },
-    }
-
-    # Precompute icon path for each item
-    computers = []
-    active_comp_res = Reservation.objects.filter(
-        resource_type="computer", end__gt=now).select_related("user")
-    comp_res_map = {}
-    for r in active_comp_res:
-        if r.resource_id not in comp_res_map:
-            comp_res_map[r.resource_id] = []
-        comp_res_map[r.resource_id].append(r)
-
-    for c in Computer.objects.order_by("name"):
-        d = model_to_dict(c, fields=["id", "name", "x", "y", "status"])
-        current_res_list = comp_res_map.get(c.id, [])
-        current_res = next((r for r in current_res_list
-                            if r.start <= now < r.end), None)
-        is_mine = current_res and current_res.user_id == request.user.id
-
-        if c.status == "repair":
-            d["icon"] = icon_map["computer"]["repair"]
-            d["status"] = "repair"
-        elif current_res:
-            d["status"] = "reserved" if is_mine else "occupied"
-            d["icon"] = icon_map["computer"]["reserved" if is_mine else "occupied"]
-        else:
-            d["status"] = "available"
-            d["icon"] = icon_map["computer"]["available"]
-
-        d["is_mine"] = bool(is_mine)
-        computers.append(d)
-
-    rooms = []
-    active_room_res = Reservation.objects.filter(
-        resource_type="room", end__gt=now).select_related("user")
-    room_res_map = {}
-    for r in active_room_res:
-        room_res_map.setdefault(r.resource_id, []).append(r)
-
-    for r in StudyRoom.objects.order_by("name"):
-        d = model_to_dict(r, fields=["id", "name", "x", "y", "status"])
-        current_res_list = room_res_map.get(r.id, [])
-        current_res = next((res for res in current_res_list
-                            if res.start <= now < res.end), None)
-        is_mine = current_res and current_res.user_id == request.user.id
-
-        if r.status == "out_of_order":
-            d["icon"] = icon_map["room"]["out_of_order"]
-            d["status"] = "out_of_order"
-        elif current_res:
-            d["status"] = "reserved" if is_mine else "occupied"
-            d["icon"] = icon_map["room"]["reserved" if is_mine else "occupied"]
-        else:
-            d["status"] = "available"
-            d["icon"] = icon_map["room"]["available"]
-
-        d["is_mine"] = bool(is_mine)
-        rooms.append(d)
+    # Status is computed from live reservations; expiry runs in the background
+    # (see `manage.py expire_reservations`), so this view never writes.
+    # The floor itself comes from a shared cached snapshot; only the per-viewer
+    # overlay (is_mine, icon, user_active) is computed per request.
+    floor = overlay_for_user(get_snapshot(), request.user.id)
+    computers = floor["computers"]
+    rooms = floor["rooms"]
 
     return render(request, "available-computers.html", {
         "computers": computers,
@@ -203,15 +178,64 @@ def available_computers(request):
     })
 
 
+# Seconds between keepalives; each one also resyncs against the floor snapshot
+# so time-driven changes (bookings starting/ending) and writes seen by other
+# processes still reach the page.
+STREAM_HEARTBEAT = 15
+
+
+async def status_stream(request):
+    """
+    Server-Sent Events feed of status deltas for the floor map:
+    {"type", "id", "status", "is_mine"} per changed computer/room.
+    Needs the ASGI app (utrgv_link_up.asgi); a WSGI server would have to
+    buffer the endless stream, so there the page keeps its reload fallback.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse("Status stream requires the ASGI server.", status=501)
+
+    user = await request.auser()
+    user_id = user.id
+
+    def current_statuses():
+        return viewer_statuses(get_snapshot(), user_id)
+
+    async def events():
+        queue = status_changes.subscribe()
+        try:
+            last = await sync_to_async(current_statuses)()
+            yield f"retry: {STREAM_HEARTBEAT * 1000}\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), STREAM_HEARTBEAT)
+                    status, _, is_mine = resource_view(message["type"], message, user_id)
+                    changes = {(message["type"], message["id"]): (status, is_mine)}
+                except asyncio.TimeoutError:
+                    changes = await sync_to_async(current_statuses)()
+                    yield ": keepalive\n\n"
+                for (resource_type, pk), state in changes.items():
+                    if last.get((resource_type, pk)) == state:
+                        continue
+                    last[(resource_type, pk)] = state
+                    payload = {"type": resource_type, "id": pk,
+                               "status": state[0], "is_mine": state[1]}
+                    yield f"data: {json.dumps(payload)}\n\n"
+        finally:
+            status_changes.unsubscribe(queue)
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 def _active_reservation_for_user(user):
     now = timezone.localtime()
-    res = Reservation.objects.filter(user=user, end__gt=now).order_by("start").first()
+    res = Reservation.objects.filter(user=user, end__gt=now).select_related(
+        "computer", "room").order_by("start").first()
     if not res:
         return None
-    # Fetch display name for resource
-    Model = Computer if res.resource_type == "computer" else StudyRoom
-    obj = Model.objects.filter(pk=res.resource_id).first()
-    name = obj.name if obj else f"{res.resource_type.title()} #{res.resource_id}"
+    name = res.resource.name
     return {
         "id": res.id,
         "resource_type": res.resource_type,
@@ -228,50 +252,17 @@ def _round_down_to_half_hour(dt):
     return dt.replace(minute=30)
 
 
-def _cleanup_status_for_resource(model_cls, resource_type, now):
-    # If a resource is marked reserved/occupied but has no live reservation, free it.
-    stale = model_cls.objects.filter(
-        status__in=["reserved", "occupied"],
-        reserved_by__isnull=False
-    )
-    for obj in stale:
-        has_active = Reservation.objects.filter(
-            resource_type=resource_type,
-            resource_id=obj.id,
-            start__lte=now,
-            end__gt=now
-        ).exists()
-        if not has_active:
-            obj.status = "available"
-            obj.reserved_by = None
-            obj.save(update_fields=["status", "reserved_by"])
-
-
-def cleanup_expired_reservations():
-    now = timezone.localtime()
-    Reservation.objects.filter(end__lte=now).delete()
-    _cleanup_status_for_resource(Computer, "computer", now)
-    _cleanup_status_for_resource(StudyRoom, "room", now)
-
-
 @login_required
 @require_POST
 def cancel_reservation(request):
-    cleanup_expired_reservations()
     now = timezone.now()
-    active = Reservation.objects.filter(user=request.user, end__gt=now)
-    count = active.count()
-    for res in active:
-        Model = Computer if res.resource_type == "computer" else StudyRoom
-        obj = Model.objects.filter(pk=res.resource_id).first()
-        if obj:
-            obj.status = "available"
-            obj.reserved_by = None
-            obj.save(update_fields=["status", "reserved_by"])
-    active.delete()
-    return JsonResponse({"ok": True, "cleared": count})
+    # Live status is derived from reservations, so removing them is enough
+    # (and leaves a staff-set repair/out_of_order status alone)
+    _, deleted = Reservation.objects.filter(user=request.user, end__gt=now).delete()
+    return JsonResponse({"ok": True, "cleared": deleted.get(Reservation._meta.label, 0)})
 
 
+@read_replica
 @login_required
 @require_POST
 def available_slots(request):
@@ -288,37 +279,36 @@ def available_slots(request):
     except ValueError:
         return HttpResponseBadRequest("ID must be an integer")
 
+    if item_type not in Reservation.RESOURCE_FIELDS:
+        return HttpResponseBadRequest("type must be 'computer' or 'room'")
     Model = Computer if item_type == "computer" else StudyRoom
     obj = Model.objects.filter(pk=pk).first()
     if not obj:
         return HttpResponseBadRequest("Not found")
 
-    cleanup_expired_reservations()
     now = timezone.localtime()
-    tz = timezone.get_current_timezone()
     today = now.date()
-    day_start = timezone.make_aware(datetime.combine(today, time(8, 0)), tz)
-    day_end = timezone.make_aware(datetime.combine(today, time(20, 0)), tz)
+    day_start, day_end = picker_bounds(today)
 
     start_at = max(day_start, _round_down_to_half_hour(now))
-    reservations = list(Reservation.objects.filter(
-        resource_type=item_type,
-        resource_id=pk,
+    avail = DayAvailability(today)
+    for res in reservations_for_day(Reservation.objects.filter(
+        **Reservation.resource_lookup(item_type, pk),
         end__gt=now
-    ))
-    is_free_now = not any(res.start <= now < res.end for res in reservations)
-
-    slots = []
-    cursor = start_at
-    while cursor + timedelta(hours=1) <= day_end:
-        end_cursor = cursor + timedelta(hours=1)
-        overlap = any(res.start < end_cursor and res.end > cursor for res in reservations)
-        slots.append({
-            "start": cursor.isoformat(),
-            "end": end_cursor.isoformat(),
-            "available": not overlap,
-        })
-        cursor += timedelta(minutes=30)
+    ), today):
+        avail.add_reservation(res)
+    holder = avail.holder_at(now)
+    is_free_now = avail.is_free_at(now)
+
+    # Stored status may lag until the expiry job runs; report the live one
+    resource_status = obj.status
+    if resource_status not in ("repair", "out_of_order"):
+        if holder is None:
+            resource_status = "available"
+        else:
+            resource_status = "reserved" if holder == request.user.id else "occupied"
+
+    slots = avail.windows(start_at, day_end)
 
     user_res = Reservation.objects.filter(user=request.user, end__gt=now).order_by("start").first()
     user_active = None
@@ -333,13 +323,75 @@ def available_slots(request):
     return JsonResponse({
         "slots": slots,
         "resource_name": obj.name,
-        "resource_status": obj.status,
+        "resource_status": resource_status,
         "user_active": user_active,
         "current_available": is_free_now,
         "now": now.isoformat(),
     })
 
 
+@read_replica
+@require_GET
+def availability_grid(request):
+    """
+    Today's half-hour grid (8am-8pm) for every computer and study room, built
+    from one ranged Reservation query. Each resource gets a bitstring with one
+    character per half hour: "1" free, "0" booked.
+    Optional filters: ?type=computer|room and ?ids=1,2,3 (with type).
+    """
+    item_type = request.GET.get("type")
+    if item_type not in (None, "computer", "room"):
+        return HttpResponseBadRequest("type must be 'computer' or 'room'")
+    ids = None
+    if request.GET.get("ids"):
+        if not item_type:
+            return HttpResponseBadRequest("ids requires type")
+        try:
+            ids = [int(i) for i in request.GET["ids"].split(",")]
+        except ValueError:
+            return HttpResponseBadRequest("ids must be comma-separated integers")
+
+    now = timezone.localtime()
+    today = now.date()
+    open_at, close_at = picker_bounds(today)
+
+    reservations = reservations_for_day(Reservation.objects.only(
+        "resource_type", "computer", "room", "user", "start", "end"), today)
+    if item_type:
+        reservations = reservations.filter(resource_type=item_type)
+    if ids is not None:
+        reservations = reservations.filter(
+            **{f"{item_type}__in": ids})
+    index = AvailabilityIndex(today, reservations)
+    first, last = DayAvailability(today).cell_range(open_at, close_at)
+
+    grid = {}
+    for resource_type, Model in (("computer", Computer), ("room", StudyRoom)):
+        if item_type and item_type != resource_type:
+            continue
+        resources = Model.objects.order_by("name").values_list("id", "name", "status")
+        if ids is not None:
+            resources = resources.filter(pk__in=ids)
+        grid[resource_type] = {
+            str(pk): {
+                "name": name,
+                # Only out-of-service states are meaningful; the rest comes from the grid
+                "status": status if status in ("repair", "out_of_order") else "available",
+                "slots": index.get(resource_type, pk).bitstring(first, last),
+            }
+            for pk, name, status in resources
+        }
+
+    return JsonResponse({
+        "date": today.isoformat(),
+        "start": open_at.isoformat(),
+        "end": close_at.isoformat(),
+        "slot_minutes": SLOT_MINUTES,
+        "now": now.isoformat(),
+        "resources": grid,
+    })
+
+
 @login_required
 @require_POST
 def create_reservation(request):
@@ -360,13 +412,13 @@ def create_reservation(request):
     except ValueError:
         return HttpResponseBadRequest("ID must be an integer")
 
+    if item_type not in Reservation.RESOURCE_FIELDS:
+        return HttpResponseBadRequest("type must be 'computer' or 'room'")
     Model = Computer if item_type == "computer" else StudyRoom
     obj = Model.objects.filter(pk=pk).first()
     if not obj:
         return HttpResponseBadRequest("Not found")
 
-    cleanup_expired_reservations()
-
     now_local = timezone.localtime()
     if reserve_now:
         start_dt = _round_down_to_half_hour(now_local)
@@ -392,48 +444,282 @@ def create_reservation(request):
     if start_dt < earliest or end_dt > latest_end:
         return HttpResponseBadRequest("Outside reservable hours (8am-8pm)")
 
-    now = timezone.localtime()
-    if end_dt <= now:
-        return HttpResponseBadRequest("Time slot has passed")
-
-    # One active reservation across computers/rooms
-    has_active = Reservation.objects.filter(user=request.user, end__gt=now).exists()
-    if has_active:
-        return HttpResponseBadRequest("You already have an active reservation.")
-
     # Block if resource is out of order/repair
     if getattr(obj, "status", "available") in ["repair", "out_of_order"]:
         return HttpResponseBadRequest("This spot is currently unavailable.")
 
-    overlap = Reservation.objects.filter(
-        resource_type=item_type,
-        resource_id=pk,
-        start__lt=end_dt,
-        end__gt=start_dt
-    ).exists()
-    if overlap:
+    day_start, day_end = day_bounds(today)
+    try:
+        # IMMEDIATE transaction: SQLite's write lock is held from the first
+        # read, so no other booking can slip in between the checks and insert.
+        with transaction.atomic():
+            now = timezone.localtime()
+            if end_dt <= now:
+                return HttpResponseBadRequest("Time slot has passed")
+
+            # One read covers both the user's live bookings and today's
+            # bookings on this resource
+            avail = DayAvailability(today)
+            has_active = False
+            for res in Reservation.objects.filter(
+                Q(user=request.user, end__gt=now) |
+                Q(**Reservation.resource_lookup(item_type, pk),
+                  start__lt=day_end, end__gt=day_start)
+            ):
+                if res.user_id == request.user.id and res.end > now:
+                    has_active = True
+                if res.resource_type == item_type and res.resource_id == pk:
+                    avail.add_reservation(res)
+
+            # One active reservation across computers/rooms
+            if has_active:
+                return HttpResponseBadRequest("You already have an active reservation.")
+            if not avail.is_free(start_dt, end_dt):
+                return HttpResponseBadRequest("That slot is no longer available.")
+
+            # Single write: live status is derived from reservations
+            Reservation.objects.create(
+                **Reservation.resource_lookup(item_type, pk),
+                user=request.user,
+                start=start_dt,
+                end=end_dt,
+            )
+    except IntegrityError:
+        # unique_computer/room_slot_start caught a concurrent booking
         return HttpResponseBadRequest("That slot is no longer available.")
 
-    Reservation.objects.create(
-        resource_type=item_type,
-        resource_id=pk,
-        user=request.user,
-        start=start_dt,
-        end=end_dt,
-    )
+    return JsonResponse({"ok": True})
 
-    obj.status = "reserved"
-    obj.reserved_by = request.user
-    obj.save(update_fields=["status", "reserved_by"])
 
-    return JsonResponse({"ok": True})
+SEARCH_RESULT_LIMIT = 25
+
+
+@read_replica
+@login_required
+@require_GET
+def search_typeahead(request):
+    """
+    Typeahead over events and venues: ?q=<text>[&type=event|venue][&limit=N].
+    The last word matches as a prefix; results are best match first.
+    """
+    query = request.GET.get("q", "").strip()
+    kind = request.GET.get("type")
+    if kind not in (None, "event", "venue"):
+        return HttpResponseBadRequest("type must be event or venue")
+    try:
+        limit = max(1, min(int(request.GET.get("limit", 8)), SEARCH_RESULT_LIMIT))
+    except ValueError:
+        return HttpResponseBadRequest("limit must be an integer")
+
+    hits = search.search(query, kind, limit)
+    events = Event.objects.only("name", "event_date").in_bulk(
+        [pk for k, pk in hits if k == "event"])
+    venues = Venue.objects.only("name", "city", "state").in_bulk(
+        [pk for k, pk in hits if k == "venue"])
+    events_url = reverse("link_up:all-events-student")
+
+    results = []
+    for k, pk in hits:
+        if k == "event" and pk in events:
+            event = events[pk]
+            results.append({
+                "type": "event", "id": pk, "title": event.name,
+                "detail": timezone.localtime(event.event_date).strftime("%b %d, %Y %I:%M %p"),
+                "url": f"{events_url}?{urlencode({'q': event.name, 'archive': 1})}",
+            })
+        elif k == "venue" and pk in venues:
+            venue = venues[pk]
+            results.append({
+                "type": "venue", "id": pk, "title": venue.name,
+                "detail": f"{venue.city}, {venue.state}",
+                "url": reverse("link_up:show-venue", args=[pk]),
+            })
+    return JsonResponse({"query": query, "results": results})
+
+
+AUTOCOMPLETE_LIMIT = 20
+# Entries are keyed by a version counter, so this only bounds idle memory
+AUTOCOMPLETE_TIMEOUT = 60 * 60
+
+
+def _autocomplete(request, scope, lookup):
+    """Cached {"results": [{"id", "text"}]} for ?q=, keyed by scope's version."""
+    query = " ".join(request.GET.get("q", "").lower().split())[:60]
+    # Hashed: raw queries carry spaces, which memcached rejects in keys
+    digest = hashlib.md5(query.encode()).hexdigest()
+    key = f"link_up:autocomplete:{scope}:{get_version(scope)}:{digest}"
+    results = cache.get(key)
+    if results is None:
+        with primary():
+            results = lookup(query)
+        cache.set(key, results, AUTOCOMPLETE_TIMEOUT)
+    return JsonResponse({"results": results})
+
+
+@read_replica
+@login_required
+@require_GET
+def autocomplete_venues(request):
+    def lookup(query):
+        if query:
+            ids = search.matching_ids(query, "venue", AUTOCOMPLETE_LIMIT)
+            venues = Venue.objects.only("name", "city").in_bulk(ids)
+            rows = [venues[pk] for pk in ids if pk in venues]
+        else:
+            rows = Venue.objects.only("name", "city").order_by("name")[:AUTOCOMPLETE_LIMIT]
+        return [{"id": v.pk, "text": f"{v.name} ({v.city})" if v.city else v.name} for v in rows]
+
+    return _autocomplete(request, "venues", lookup)
+
+
+@read_replica
+@login_required
+@require_GET
+def autocomplete_managers(request):
+    def lookup(query):
+        managers = User.objects.filter(manager__isnull=False)
+        for word in query.split():
+            managers = managers.filter(
+                Q(username__istartswith=word) | Q(first_name__istartswith=word)
+                | Q(last_name__istartswith=word))
+        managers = managers.only("username", "first_name", "last_name").order_by(
+            "first_name", "last_name", "username")[:AUTOCOMPLETE_LIMIT]
+        return [{"id": u.pk, "text": manager_label(u)} for u in managers]
+
+    return _autocomplete(request, "managers", lookup)
 
 
 def media_equipment(request):
     return render(request, 'media-equipment.html', {})
 
 
-def events(request, year=datetime.now().year, month=datetime.now().strftime('%B')):
+EVENTS_PAGE_SIZE = 24
+
+
+def _event_window(request, upcoming_by_default=False):
+    """
+    Date window from the query string as (start, end), either may be None:
+    ?month=YYYY-MM for one month, or ?from=YYYY-MM-DD&to=YYYY-MM-DD (inclusive).
+    With neither, optionally only events from today onwards (?archive=1 lifts that).
+    """
+    tz = timezone.get_current_timezone()
+    start = end = None
+    if request.GET.get("month"):
+        try:
+            first = datetime.strptime(request.GET["month"], "%Y-%m").date()
+        except ValueError:
+            first = None
+        if first:
+            next_first = (first + timedelta(days=32)).replace(day=1)
+            start = timezone.make_aware(datetime.combine(first, time(0, 0)), tz)
+            end = timezone.make_aware(datetime.combine(next_first, time(0, 0)), tz)
+    else:
+        start_date = parse_date(request.GET.get("from") or "")
+        end_date = parse_date(request.GET.get("to") or "")
+        if start_date:
+            start = timezone.make_aware(datetime.combine(start_date, time(0, 0)), tz)
+        if end_date:
+            end = timezone.make_aware(
+                datetime.combine(end_date + timedelta(days=1), time(0, 0)), tz)
+    if start is None and end is None and upcoming_by_default and not request.GET.get("archive"):
+        start = timezone.make_aware(datetime.combine(timezone.localdate(), time(0, 0)), tz)
+    return start, end
+
+
+def _encode_cursor(event):
+    stamp = event.event_date.astimezone(dt_timezone.utc).strftime("%Y%m%d%H%M%S%f")
+    return f"{stamp}-{event.pk}"
+
+
+def _decode_cursor(cursor):
+    try:
+        stamp, pk = cursor.split("-")
+        when = datetime.strptime(stamp, "%Y%m%d%H%M%S%f").replace(tzinfo=dt_timezone.utc)
+        return when, int(pk)
+    except (AttributeError, ValueError):
+        return None
+
+
+def _event_page(request, event_list, upcoming_by_default=False):
+    """
+    One keyset page of event_list ordered by (event_date, id), restricted to
+    the requested date window, with the viewer's RSVPs and waitlist spots
+    precomputed so the template never loads event.attendees per card.
+    Returns the extra template context.
+    """
+    start, end = _event_window(request, upcoming_by_default)
+    query = request.GET.get("q", "").strip()
+    if query:
+        event_list = event_list.filter(search.matching_filter(query, "event"))
+    if start is not None:
+        event_list = event_list.filter(event_date__gte=start)
+    if end is not None:
+        event_list = event_list.filter(event_date__lt=end)
+
+    # Keyset pagination: seek past the last row of the previous page, so
+    # every page costs the same no matter how deep the archive goes
+    after = _decode_cursor(request.GET.get("after"))
+    if after:
+        when, pk = after
+        event_list = event_list.filter(
+            Q(event_date__gt=when) | Q(event_date=when, pk__gt=pk))
+
+    # attendee_count is a maintained column, no per-page COUNT needed
+    page = list(event_list.select_related("venue").prefetch_related("renditions").order_by(
+        "event_date", "pk")[:EVENTS_PAGE_SIZE + 1])
+
+    next_query = None
+    if len(page) > EVENTS_PAGE_SIZE:
+        page = page[:EVENTS_PAGE_SIZE]
+        params = request.GET.copy()
+        params["after"] = _encode_cursor(page[-1])
+        next_query = params.urlencode()
+
+    student = getattr(request.user, "student", None)
+    if student is not None and page:
+        state = rsvp.attendance_state(student, [e.pk for e in page])
+        for event in page:
+            event.rsvp_status = state[event.pk]
+
+    return {
+        "event_list": page,
+        "next_page_query": next_query,
+        "filter_month": request.GET.get("month", ""),
+        "search_query": query,
+    }
+
+
+def _calendar_context(request, year=None, month=None):
+    """
+    Month shown on the event calendar: the ?month=YYYY-MM listing filter,
+    else the URL's year/month, else the current local month (worked out per
+    request, not once at import).
+    """
+    today = timezone.localdate()
+    year = int(year or today.year)
+    month_number = today.month if month is None else list(calendar.month_name).index(month.capitalize())
+    filtered = request.GET.get("month", "")
+    try:
+        picked = datetime.strptime(filtered, "%Y-%m")
+        year, month_number = picked.year, picked.month
+    except ValueError:
+        pass
+    prev_year, prev_month = (year - 1, 12) if month_number == 1 else (year, month_number - 1)
+    next_year, next_month = (year + 1, 1) if month_number == 12 else (year, month_number + 1)
+    return {
+        "year": year,
+        "month": calendar.month_name[month_number],
+        "month_number": month_number,
+        "cal": render_month(year, month_number),
+        "prev_month": f"{prev_year}-{prev_month:02d}",
+        "next_month": f"{next_year}-{next_month:02d}",
+    }
+
+
+@read_replica
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=events_etag)
+def events(request, year=None, month=None):
     event_list = Event.objects.none()
     if request.user.is_authenticated:
         # Check if the user is linked to a Manager profile
@@ -450,30 +736,21 @@ def events(request, year=datetime.now().year, month=datetime.now().strftime('%B'
             current_student_profile = request.user.student
             event_list = Event.objects.filter(
                 attendees=current_student_profile).order_by('event_date')
+    page_context = _event_page(request, event_list)
     name = "John"
-    month = month.capitalize()
-    # Covert mont from name to number
-    month_number = list(calendar.month_name).index(month)
-    month_number = int(month_number)
-
-    # Create a calendar
-    cal = HTMLCalendar().formatmonth(year, month_number)
 
     # Get current year
-    now = datetime.now()
+    now = timezone.localtime()
     current_year = now.year
 
     # Get current time
     time = now.strftime('%I:%M %p')
     return render(request, 'events.html', {
         "name": name,
-        "year": year,
-        "month": month,
-        "month_number": month_number,
-        "cal": cal,
         "current_year": current_year,
         "time": time,
-        "event_list": event_list,
+        **_calendar_context(request, year, month),
+        **page_context,
     })
 
 
@@ -496,6 +773,9 @@ def add_venue(request):
         'submitted': submitted,
     })
 
+@read_replica
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=venues_etag)
 def list_venues(request):
     if request.user.is_authenticated:
         # Filter: Only show venues owned by the current user
@@ -507,6 +787,7 @@ def list_venues(request):
         'venue_list': venue_list,
     })
 
+@read_replica
 def show_venue(request, venue_id):
     venue = Venue.objects.get(pk=venue_id)
     return render(request, 'show_venue.html', {
@@ -576,49 +857,45 @@ def not_attend(request, event_id):
     if hasattr(request.user, 'student'):
         current_student = request.user.student
 
-        # 3. Remove the student profile from the event's attendees list
-        # The remove() method on the M2M manager handles the deletion.
-        event.attendees.remove(current_student)
+        # 3. Give up the seat (or waitlist spot); the next student waiting moves up
+        rsvp.leave_event(current_student, event.pk)
 
     # 4. Redirect the user back to the events list page
     return redirect('link_up:events')
     # Ensure 'link_up:events' matches your actual events list URL name
 
 
+@read_replica
 @login_required
-def my_events(request, year=datetime.now().year, month=datetime.now().strftime('%B')):
+def my_events(request, year=None, month=None):
     # 1. Filter events the student is attending
     current_student_profile = request.user.student
     event_list = Event.objects.filter(
         attendees=current_student_profile).order_by('event_date')
 
-    # ... (Reuse the existing calendar generation code and context) ...
-    # You need to ensure all context variables (name, year, month, etc.) are defined here,
-    # or you can consolidate the calendar logic into a helper function.
-
-    # Example minimal context (you should include all variables your template needs):
     context = {
-        'event_list': event_list,
+        **_event_page(request, event_list),
+        **_calendar_context(request, year, month),
         'name': request.user.first_name or request.user.username,
-        # ... include calendar variables like 'year', 'month', 'cal', etc.
+        'calendar_feed_url': ics.feed_url(request, request.user),
         'view_mode': 'my_events'  # Pass a flag to the template for button styling
     }
 
     return render(request, 'events.html', context)
 
 
+@read_replica
 @login_required
-def all_events_student(request, year=datetime.now().year, month=datetime.now().strftime('%B')):
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=events_etag)
+def all_events_student(request, year=None, month=None):
     # 1. Retrieve all events
     event_list = Event.objects.all().order_by('event_date')
 
-    # ... (Reuse the existing calendar generation code and context) ...
-
-    # Example minimal context:
     context = {
-        'event_list': event_list,
+        **_event_page(request, event_list, upcoming_by_default=True),
+        **_calendar_context(request, year, month),
         'name': request.user.first_name or request.user.username,
-        # ... include calendar variables like 'year', 'month', 'cal', etc.
         'view_mode': 'all_events'  # Pass a flag to the template for button styling
     }
 
@@ -634,11 +911,246 @@ def attend_event(request, event_id):
     if hasattr(request.user, 'student'):
         current_student = request.user.student
 
-        # Add the student profile to the event's attendees list
-        # The add() method on the M2M manager handles the inclusion.
-        event.attendees.add(current_student)
+        # Take a seat if there is one left, otherwise join the waitlist
+        if rsvp.join_event(current_student, event.pk) == rsvp.WAITLISTED:
+            messages.info(request, f"{event} is full, you're on the waitlist.")
 
     # Redirect the user back to the events list page (My Events or All Events)
     # Use the 'my-events' or 'all-events-student' name depending on where the user should go next.
     # Redirecting to My Events is usually logical
     return redirect('link_up:my-events')
+
+
+RSVP_BATCH_LIMIT = 200
+
+
+def _event_ids(value):
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise ValueError
+    return list({int(pk) for pk in value})
+
+
+@login_required
+@require_POST
+def bulk_rsvp(request):
+    """
+    RSVP to / leave many events at once:
+    {"attend": [event ids], "leave": [event ids]}. Full events put the
+    student on the waitlist instead. Returns the student's attendance for
+    every requested event and the new attendee counts.
+    """
+    student = getattr(request.user, "student", None)
+    if student is None:
+        return JsonResponse({"error": "Only students can RSVP to events."}, status=403)
+
+    try:
+        data = json.loads(request.body.decode())
+        attend = _event_ids(data.get("attend"))
+        leave = _event_ids(data.get("leave"))
+    except json.JSONDecodeError:
+        return HttpResponseBadRequest("Invalid JSON format")
+    except (AttributeError, TypeError, ValueError):
+        return HttpResponseBadRequest("attend and leave must be lists of event IDs")
+    if set(attend) & set(leave):
+        return HttpResponseBadRequest("An event can't be in both attend and leave")
+    if len(attend) + len(leave) > RSVP_BATCH_LIMIT:
+        return HttpResponseBadRequest(f"At most {RSVP_BATCH_LIMIT} events per request")
+
+    with transaction.atomic():
+        joined = rsvp.join_events(student, attend)
+        removed = rsvp.leave_events(student, leave)
+    # Through-table and counter writes skip the model signals, so invalidate by hand
+    if attend or leave:
+        bump_version("events")
+
+    requested = attend + leave
+    state = rsvp.attendance_state(student, requested)
+    events = Event.objects.filter(pk__in=requested).select_related("venue")
+    return JsonResponse({
+        "ok": True,
+        "removed": removed,
+        "events": {
+            str(event.pk): {
+                "status": state[event.pk],
+                "attending": state[event.pk] == rsvp.ATTENDING,
+                "attendee_count": event.attendee_count,
+                "capacity": event.seat_limit,
+            }
+            for event in events
+        },
+        "waitlisted": sorted(pk for pk, status in joined.items() if status == rsvp.WAITLISTED),
+        "rejected": sorted(set(attend) - set(joined)),
+    })
+
+
+def _feed_etag(request, token):
+    user_id = ics.user_id_from_token(token)
+    return ics.feed_state(user_id)[1] if user_id else None
+
+
+def _feed_last_modified(request, token):
+    user_id = ics.user_id_from_token(token)
+    cached = ics.cached_feed(ics.feed_state(user_id)[0]) if user_id else None
+    return cached[1] if cached else None
+
+
+@read_replica
+@require_GET
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_feed_etag, last_modified_func=_feed_last_modified)
+def calendar_feed(request, token):
+    """
+    Subscribable .ics of a student's RSVP'd events and upcoming reservations.
+    The signed token in the URL stands in for a login.
+    """
+    user_id = ics.user_id_from_token(token)
+    if user_id is None or not User.objects.filter(pk=user_id, is_active=True).exists():
+        raise Http404("Unknown calendar feed")
+
+    key, _ = ics.feed_state(user_id)
+    cached = ics.cached_feed(key)
+    if cached is not None:
+        response = HttpResponse(cached[0], content_type="text/calendar; charset=utf-8")
+    else:
+        now = timezone.now()
+
+        def stream():
+            # Send each VEVENT as it's built, keep the whole feed for next time
+            chunks = []
+            # Runs after the view returned, outside @read_replica, so it reads
+            # the primary: right for content cached under the current version
+            for chunk in ics.generate_feed(user_id, now):
+                chunks.append(chunk)
+                yield chunk
+            ics.store_feed(key, "".join(chunks), now)
+
+        response = StreamingHttpResponse(stream(), content_type="text/calendar; charset=utf-8")
+        response["Last-Modified"] = http_date(now.timestamp())
+    response["Content-Disposition"] = 'inline; filename="utrgv-link-up.ics"'
+    return response
+
+
+@read_replica
+@login_required
+@require_GET
+def export_event_attendees(request, event_id):
+    """CSV of an event's attendees and waitlist, for its manager or staff."""
+    event = get_object_or_404(Event, pk=event_id)
+    if not (request.user.is_staff or event.manager_id == request.user.pk):
+        return HttpResponseForbidden("Only the event's manager can export attendees.")
+    return exports.csv_response(
+        f"event-{event.pk}-attendees.csv", exports.ATTENDEE_HEADER,
+        iterate_with_intent(exports.attendee_rows(event)))
+
+
+def _local_midnight(day):
+    return timezone.make_aware(datetime.combine(day, time(0, 0)), timezone.get_current_timezone())
+
+
+def _date_range(request):
+    """
+    Aware [start, end) from ?from=YYYY-MM-DD&to=YYYY-MM-DD (both inclusive);
+    a missing side is None. Raises ValueError on a malformed date.
+    """
+    bounds = []
+    for param, shift in (("from", 0), ("to", 1)):
+        value = request.GET.get(param)
+        if not value:
+            bounds.append(None)
+            continue
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"{param} must be YYYY-MM-DD")
+        bounds.append(_local_midnight(day + timedelta(days=shift)))
+    return bounds
+
+
+@read_replica
+@staff_member_required
+@require_GET
+def export_reservations(request):
+    """Reservation history as CSV; ?from=YYYY-MM-DD&to=YYYY-MM-DD (inclusive) narrows it."""
+    try:
+        start, end = _date_range(request)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    filename = "reservations-{}-to-{}.csv".format(
+        request.GET.get("from") or "start", request.GET.get("to") or "now")
+    # Keep the replica intent for the rows, which are read while streaming
+    return exports.csv_response(
+        filename, exports.RESERVATION_HEADER,
+        iterate_with_intent(exports.reservation_rows(start, end)))
+
+
+# Default window of the utilization heatmap
+UTILIZATION_DAYS = 28
+
+
+@read_replica
+@staff_member_required
+@require_GET
+def utilization_heatmap(request):
+    """
+    Staff heatmap of booked share per weekday x hour, overall and per
+    computer/room, from the hourly rollups. ?from/&to (inclusive, default the
+    last 28 days) and ?type=computer|room narrow it. heatmap[weekday][hour]
+    is booked minutes / minutes that weekday-hour occurred in the range.
+    """
+    item_type = request.GET.get("type")
+    if item_type not in (None, "computer", "room"):
+        return HttpResponseBadRequest("type must be 'computer' or 'room'")
+    try:
+        start, end = _date_range(request)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    today = timezone.localdate()
+    end = end or _local_midnight(today + timedelta(days=1))
+    start = start or end - timedelta(days=UTILIZATION_DAYS)
+    if start >= end:
+        return HttpResponseBadRequest("from must not be after to")
+
+    # How many times each weekday occurs in the range, to turn minutes into a share
+    first_day = timezone.localtime(start).date()
+    days = (timezone.localtime(end).date() - first_day).days
+    occurrences = [0] * 7
+    for offset in range(days):
+        occurrences[(first_day + timedelta(days=offset)).weekday()] += 1
+
+    def empty():
+        return [[0] * 24 for _ in range(7)]
+
+    overall = {"computer": empty(), "room": empty()}
+    per_resource = {"computer": {}, "room": {}}
+    for resource_type, resource_id, weekday, hour, minutes in utilization.heatmap_rows(
+            start, end, item_type):
+        overall[resource_type][weekday][hour] += minutes
+        cells = per_resource[resource_type].setdefault(resource_id, empty())
+        cells[weekday][hour] += minutes
+
+    def shares(cells, resources=1):
+        return [
+            [round(minutes / (60 * occurrences[weekday] * resources), 3)
+             if occurrences[weekday] else 0 for minutes in row]
+            for weekday, row in enumerate(cells)
+        ]
+
+    payload = {}
+    for resource_type, Model in (("computer", Computer), ("room", StudyRoom)):
+        if item_type and item_type != resource_type:
+            continue
+        names = dict(Model.objects.values_list("id", "name"))
+        payload[resource_type] = {
+            "heatmap": shares(overall[resource_type], max(len(names), 1)),
+            "resources": {
+                str(pk): {"name": names.get(pk, ""), "heatmap": shares(cells)}
+                for pk, cells in per_resource[resource_type].items()
+            },
+        }
+    return JsonResponse({
+        "from": first_day.isoformat(),
+        "to": (timezone.localtime(end).date() - timedelta(days=1)).isoformat(),
+        "weekdays": list(calendar.day_abbr),
+        "resources": payload,
+    })
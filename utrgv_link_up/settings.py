@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from link_up.db import SQLITE_TIMEOUT, connection_settings
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -43,6 +46,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Disabled unless LINK_UP_REQUEST_METRICS is True (see below)
+    'link_up.middleware.RequestMetricsMiddleware',
+    # Disabled unless LINK_UP_READ_REPLICAS is set; sits outside the session
+    # middleware so session saves count as writes
+    'link_up.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -52,6 +60,29 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-request timing / query-count instrumentation. Off by default; when on,
+# every request logs a line to the "link_up.metrics" logger and staff can read
+# the aggregates at /api/metrics/. A request running the same SQL shape at
+# least LINK_UP_N_PLUS_ONE_THRESHOLD times is flagged as a likely N+1.
+LINK_UP_REQUEST_METRICS = False
+LINK_UP_N_PLUS_ONE_THRESHOLD = 5
+
+# Event image renditions (link_up.renditions) are built on a background thread
+# pool after the upload commits. Set True to build them inline instead, e.g.
+# from the shell or in tests.
+LINK_UP_RENDITIONS_SYNC = False
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'link_up.metrics': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 ROOT_URLCONF = 'utrgv_link_up.urls'
 
 TEMPLATES = [
@@ -71,6 +102,10 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'utrgv_link_up.wsgi.application'
 
+# The live status stream (link_up.views.status_stream) needs an ASGI server,
+# e.g. `uvicorn utrgv_link_up.asgi:application`.
+ASGI_APPLICATION = 'utrgv_link_up.asgi.application'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -79,6 +114,56 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # atomic() blocks take the write lock at BEGIN, so booking checks
+            # and inserts are serialized instead of racing
+            'transaction_mode': 'IMMEDIATE',
+            # Seconds to wait for that lock before "database is locked"
+            'timeout': SQLITE_TIMEOUT,
+        },
+        # File-backed test DB so threaded tests get real locking semantics
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
+    }
+}
+
+# SQLite tuning applied to every new connection by link_up.db. "production"
+# turns on WAL, synchronous=NORMAL, a larger page cache and mmap. Pick it with
+# LINK_UP_DB_PROFILE=production in the environment; an unknown name fails here.
+LINK_UP_DB_PROFILE = os.environ.get('LINK_UP_DB_PROFILE', 'default')
+DATABASES['default'].update(connection_settings(LINK_UP_DB_PROFILE))
+
+# Read replicas for read-only views (link_up.routers). LINK_UP_READ_REPLICAS
+# is a comma-separated list of SQLite files, added as aliases replica1,
+# replica2, ... and refreshed from the primary with `manage.py sync_replicas`.
+# After a request that writes, that browser reads from the primary for
+# LINK_UP_STICKY_PRIMARY_SECONDS so it always sees its own changes; keep it
+# longer than the interval between syncs.
+LINK_UP_READ_REPLICAS = []
+for _index, _path in enumerate(filter(None, os.environ.get('LINK_UP_READ_REPLICAS', '').split(',')), 1):
+    _alias = f'replica{_index}'
+    DATABASES[_alias] = {
+        **DATABASES['default'],
+        'NAME': _path,
+        # Tests read the replica aliases from the test copy of default
+        'TEST': {'MIRROR': 'default'},
+    }
+    LINK_UP_READ_REPLICAS.append(_alias)
+LINK_UP_STICKY_PRIMARY_SECONDS = int(os.environ.get('LINK_UP_STICKY_PRIMARY_SECONDS', 10))
+DATABASE_ROUTERS = ['link_up.routers.ReadReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# The floor-map snapshot and its version counters live here. LocMemCache is
+# per-process; point this at a shared backend (e.g. Redis or memcached) when
+# running more than one worker so every process sees the same versions.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'utrgv-link-up',
     }
 }
 